@@ -8,220 +8,75 @@
 
 import streamlit as st
 import pandas as pd
-import re
-import sqlite3
-import calendar
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import tempfile
-
-DB_PATH = "dados_conselho_fiscal.db"
-
-# Meses abreviados
-MESES_ABREV = {f"{i:02d}": nome.lower() for i, nome in enumerate(calendar.month_abbr) if nome}
-MESES_REV = {v.lower(): f"{k:02d}" for k,v in enumerate(calendar.month_abbr) if v}
-
-
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS dados (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            referencia TEXT,
-            tipo TEXT,
-            grupo TEXT,
-            item TEXT,
-            competencia TEXT,
-            liquidacao TEXT,
-            documento TEXT,
-            forma_pgto TEXT,
-            valor REAL
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-
-def inserir_dados(df, referencia):
-    conn = sqlite3.connect(DB_PATH)
-    df = df.copy()
-    df['referencia'] = referencia
-    df = df[['referencia', 'Tipo', 'Grupo', 'Item', 'Competência', 'Liquidação', 'Documento', 'Forma de Pgto.', 'Valor']]
-    df.columns = ['referencia', 'tipo', 'grupo', 'item', 'competencia', 'liquidacao', 'documento', 'forma_pgto', 'valor']
-    df.to_sql('dados', conn, if_exists='append', index=False)
-    conn.close()
-
-def carregar_referencias():
-    conn = sqlite3.connect(DB_PATH)
-    refs = pd.read_sql_query("SELECT DISTINCT referencia FROM dados ORDER BY referencia DESC", conn)
-    conn.close()
-    return refs['referencia'].tolist()
-
-def carregar_dados_por_referencia(referencia):
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM dados WHERE referencia = ?", conn, params=(referencia,))
-    conn.close()
-    return df
-
-def excluir_referencia(referencia):
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("DELETE FROM dados WHERE referencia = ?", (referencia,))
-    conn.commit()
-    conn.close()
-
-def excluir_todos():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("DELETE FROM dados")
-    conn.commit()
-    conn.close()
-
-# Ajuste na função extrair_referencia_padronizada:
-def extrair_referencia_padronizada(df):
-    referencia = df['Liquidação'].mode(dropna=True)
-    if not referencia.empty:
-        ref_raw = str(referencia.iloc[0])
-        match = re.match(r"(\d{1,2})/(\d{4})", ref_raw)
-        if match:
-            mes = int(match.group(1))
-            ano = match.group(2)
-            mes_abrev = calendar.month_abbr[mes].lower()
-            return f"{mes_abrev}/{ano}"
-        partes = ref_raw.lower().split('/')
-        if len(partes) == 2 and partes[0] in MESES_REV:
-            return f"{partes[0]}/{partes[1]}"
-        return ref_raw
-    return 'desconhecido'
-
-def formatar_valor_brasileiro(valor):
-    """Formata valores para padrão brasileiro (R$ 1.234,56)"""
-    if pd.isna(valor):
-        return ""
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+import os
+
+from conselho_fiscal import diagnostico
+from conselho_fiscal.banco import (
+    DB_PATH,
+    carregar_referencias,
+    carregar_resumo_por_referencia,
+    carregar_totais_por_periodo,
+    excluir_referencia,
+    excluir_todos,
+    init_db,
+    inserir_dados,
+    obter_armazenamento,
+)
+from conselho_fiscal.cache import CacheLeituras, hash_conteudo
+from conselho_fiscal.consultas import criar_consultas, resumir
+from conselho_fiscal.exportacao import gerar_excel, gerar_relatorio
+from conselho_fiscal.formatacao import formatar_valor_brasileiro, formatar_valores_brasileiros
+from conselho_fiscal.ingestao import PlanilhaInvalidaError, process_excel_file
+from conselho_fiscal.lote import importar_lote, processar_lote, relatorio_lote
+from conselho_fiscal.referencias import extrair_referencia_padronizada, periodo_da_referencia
+
+# Diretório opcional para persistir em Parquet as planilhas já processadas
+CACHE_LEITURAS_DIR = os.environ.get("CONSELHO_FISCAL_CACHE_DIR")
+# Espelho Parquet opcional da tabela dados (backup e leituras analíticas)
+ARQUIVO_COLUNAR_DIR = os.environ.get("CONSELHO_FISCAL_PARQUET_DIR")
+# Motor dos resumos: "pandas" (padrão) ou "duckdb", se instalado
+MOTOR_CONSULTAS = os.environ.get("CONSELHO_FISCAL_MOTOR_CONSULTAS", "pandas")
+# Percentuais seguem numéricos (ordenáveis); o formato é aplicado só na exibição
+COLUNAS_PERCENTUAL = {
+    '% do Total': st.column_config.NumberColumn(format="%.2f%%"),
+    'Percentual': st.column_config.NumberColumn(format="%.1f%%"),
+}
+
+
+# Tempos por etapa, linhas, consultas ao banco e acertos de cache desta execução do script
+medicoes = diagnostico.iniciar()
 
 # Inicializa o banco
-init_db()
-
-def clean_and_convert_value(value):
-    """
-    Cleans and converts a string value to a float, handling parentheses for negative numbers,
-    percentage signs, thousands separators, and decimal commas.
-    """
-    value_str = str(value).strip()
-    is_negative = False
-
-    if value_str.startswith('(') and value_str.endswith(')'):
-        is_negative = True
-        value_str = value_str[1:-1] # Remove parentheses
-
-    value_str = value_str.replace('%', '') # Remove percentage sign
-    value_str = value_str.replace('.', '') # Remove thousands separator (dot)
-    value_str = value_str.replace(',', '.') # Replace comma with dot for decimal
-
-    try:
-        numeric_value = float(value_str)
-        if is_negative:
-            numeric_value *= -1
-        return numeric_value
-    except ValueError:
-        return pd.NA # Return Not Available for values that cannot be converted
-
-def process_excel_file(uploaded_file):
-    """
-    Processes the uploaded Excel file to extract and combine
-    revenue and expense data into a standardized DataFrame.
-    """
-    df = pd.read_excel(uploaded_file)
-
-    # Find header rows for 'Receitas' and 'Despesas'
-    linhas_cabecalho_receitas = df[df.iloc[:, 0].astype(str).str.strip() == 'Receitas']
-    linhas_cabecalho_despesas = df[df.iloc[:, 0].astype(str).str.strip() == 'Despesas']
-
-    indice_linha_cabecalho_receitas = -1
-    if not linhas_cabecalho_receitas.empty:
-        indice_linha_cabecalho_receitas = linhas_cabecalho_receitas.index[0]
-
-    indice_linha_cabecalho_despesas = -1
-    if not linhas_cabecalho_despesas.empty:
-        linhas_cabecalho_despesas_apos_receitas = linhas_cabecalho_despesas[linhas_cabecalho_despesas.index > indice_linha_cabecalho_receitas]
-        if not linhas_cabecalho_despesas_apos_receitas.empty:
-            indice_linha_cabecalho_despesas = linhas_cabecalho_despesas_apos_receitas.index[0]
-
-    if indice_linha_cabecalho_receitas == -1 or indice_linha_cabecalho_despesas == -1:
-        st.error("Não foi possível encontrar os cabeçalhos 'Receitas' ou 'Despesas' com correspondência exata. Verifique o conteúdo do arquivo.")
-        return None
-
-    # --- Process Receitas ---
-    df_dados_brutos_receitas = df.iloc[indice_linha_cabecalho_receitas + 1 : indice_linha_cabecalho_despesas].copy()
-    df_receitas = pd.DataFrame()
-    df_receitas['Item'] = df_dados_brutos_receitas.iloc[:, 0]
-    df_receitas['Competência'] = df_dados_brutos_receitas.iloc[:, 1]
-    df_receitas['Liquidação'] = df_dados_brutos_receitas.iloc[:, 2]
-    df_receitas['Valor'] = df_dados_brutos_receitas.iloc[:, 4]
-    df_receitas['Grupo_Checker'] = df_dados_brutos_receitas.iloc[:, 5]
-    df_receitas['Tipo'] = 'Receita'
-
-    df_receitas = df_receitas[~df_receitas['Item'].astype(str).str.startswith('Total', na=False)].copy()
-
-    df_receitas['Grupo'] = ''
-    grupo_atual_receita = ''
-    for idx in df_receitas.index:
-        eh_cabecalho_grupo = (pd.isna(df_receitas.loc[idx, 'Grupo_Checker']) or str(df_receitas.loc[idx, 'Grupo_Checker']).strip() == '') and \
-                             (pd.isna(df_receitas.loc[idx, 'Valor']) or str(df_receitas.loc[idx, 'Valor']).strip() == '')
-        if eh_cabecalho_grupo:
-            grupo_atual_receita = df_receitas.loc[idx, 'Item']
-        else:
-            df_receitas.loc[idx, 'Grupo'] = grupo_atual_receita
-
-    df_receitas_processadas = df_receitas[
-        ~((pd.isna(df_receitas['Grupo_Checker']) | (df_receitas['Grupo_Checker'].astype(str).str.strip() == '')) &\
-          (pd.isna(df_receitas['Valor']) | (df_receitas['Valor'].astype(str).str.strip() == '')))].copy()
-
-    # --- Process Despesas ---
-    df_dados_brutos_despesas = df.iloc[indice_linha_cabecalho_despesas + 1:].copy()
-    df_despesas = pd.DataFrame()
-    df_despesas['Item'] = df_dados_brutos_despesas.iloc[:, 0]
-    df_despesas['Competência'] = df_dados_brutos_despesas.iloc[:, 1]
-    df_despesas['Liquidação'] = df_dados_brutos_despesas.iloc[:, 2]
-    df_despesas['Documento'] = df_dados_brutos_despesas.iloc[:, 3]
-    df_despesas['Forma de Pgto.'] = df_dados_brutos_despesas.iloc[:, 4]
-    df_despesas['Grupo_Checker'] = df_dados_brutos_despesas.iloc[:, 5]
-    df_despesas['Valor'] = df_dados_brutos_despesas.iloc[:, 6]
-    df_despesas['Tipo'] = 'Despesa'
-
-    df_despesas = df_despesas[~df_despesas['Item'].astype(str).str.startswith('Total', na=False)].copy()
-
-    df_despesas['Grupo'] = ''
-    grupo_atual_despesa = ''
-    for i in range(len(df_despesas)):
-        if pd.isna(df_despesas.iloc[i]['Grupo_Checker']) or str(df_despesas.iloc[i]['Grupo_Checker']).strip() == '':
-            grupo_atual_despesa = df_despesas.iloc[i]['Item']
-        else:
-            df_despesas.loc[df_despesas.index[i], 'Grupo'] = grupo_atual_despesa
-
-    df_despesas_processadas = df_despesas.dropna(subset=['Grupo_Checker']).copy()
-
-    # --- Standardize and Combine DataFrames ---
-    colunas_finais = ['Tipo', 'Grupo', 'Item', 'Competência', 'Liquidação', 'Documento', 'Forma de Pgto.', 'Valor']
-
-    for col in ['Documento', 'Forma de Pgto.']:
-        if col not in df_receitas_processadas.columns:
-            df_receitas_processadas[col] = None
-        df_receitas_processadas[col] = df_receitas_processadas[col].astype(object)
-
-    df_receitas_processadas_final = df_receitas_processadas.reindex(columns=colunas_finais)
-    df_despesas_processadas_final = df_despesas_processadas.reindex(columns=colunas_finais)
-
-    df_final = pd.concat([df_receitas_processadas_final, df_despesas_processadas_final], ignore_index=True)
-
-    df_final['Valor'] = df_final['Valor'].apply(clean_and_convert_value)
-    df_final['Valor'] = pd.to_numeric(df_final['Valor'], errors='coerce')
-
-    df_final['Forma de Pgto.'] = df_final['Forma de Pgto.'].replace('', pd.NA)
-    df_final['Forma de Pgto.'] = df_final['Forma de Pgto.'].fillna('Outros')
-
-    return df_final
+init_db(diretorio_colunar=ARQUIVO_COLUNAR_DIR)
+
+
+@st.cache_resource
+def obter_banco():
+    """Conexão única com o banco, compartilhada entre reruns e sessões"""
+    return obter_armazenamento(DB_PATH)
+
+
+@st.cache_resource
+def obter_cache_leituras():
+    """Cache de planilhas processadas compartilhado entre reruns e sessões"""
+    return CacheLeituras(capacidade=8, diretorio=CACHE_LEITURAS_DIR)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def exportar_excel(chave_arquivo, _df):
+    """Excel dos dados processados, gerado uma única vez por planilha enviada (chave = hash do conteúdo)"""
+    diagnostico.contar('cache de exportação: falhas')
+    return gerar_excel(_df)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def resumos_importacao(chave_arquivo, _df):
+    """Tabelas de resumo da aba de importação, calculadas uma única vez por planilha enviada"""
+    diagnostico.contar('cache de resumos: falhas')
+    return resumir(criar_consultas(_df, MOTOR_CONSULTAS))
 
 # Streamlit App
 st.set_page_config(page_title="Solar Trindade - Receitas e Despesas", layout="wide")
@@ -239,17 +94,43 @@ with st.expander("⚠️ Configurações Avançadas"):
         excluir_todos()
         st.success("Todos os dados foram excluídos.")
 
+    banco = obter_banco()
+    st.markdown("**⏱️ Tempo das consultas ao banco (últimas execuções)**")
+    st.dataframe(banco.estatisticas().round(2), hide_index=True)
+    st.caption(f"🗃️ Cache de consultas: {banco.acertos} acerto(s), {banco.falhas} falha(s)")
+
 aba_analise, aba_historico = st.tabs(["Importação de Arquivos", "Histórico de Meses"])
 
 with aba_analise:
+    # Importação de vários meses de uma vez (carga do histórico)
+    with st.expander("📦 Importação em lote (vários meses)"):
+        arquivos_lote = st.file_uploader("Escolha os arquivos Excel (.xlsx)", type=["xlsx"], accept_multiple_files=True, key="uploader_lote")
+        if arquivos_lote and st.button("Importar arquivos em lote"):
+            with st.spinner(f"Processando {len(arquivos_lote)} arquivo(s)..."), diagnostico.etapa('importação em lote'):
+                resultados_lote = processar_lote([(arquivo.name, arquivo.getvalue()) for arquivo in arquivos_lote])
+                importar_lote(resultados_lote)
+            importados = sum(resultado.importado for resultado in resultados_lote)
+            st.success(f"✅ {importados} de {len(resultados_lote)} arquivo(s) importado(s).")
+            st.dataframe(relatorio_lote(resultados_lote), hide_index=True)
+
     uploaded_file = st.file_uploader("Escolha um arquivo Excel (.xlsx)", type=["xlsx"], key="uploader")
 
     if uploaded_file is not None:
         # Mostrar progresso de forma discreta
-        with st.spinner("Processando arquivo..."):
-            df_processed = process_excel_file(uploaded_file)
+        cache_leituras = obter_cache_leituras()
+        with st.spinner("Processando arquivo..."), diagnostico.etapa('importação') as registro:
+            try:
+                df_processed = cache_leituras.obter(uploaded_file.getvalue(), lambda: process_excel_file(uploaded_file))
+            except PlanilhaInvalidaError as erro:
+                st.error(str(erro))
+                df_processed = None
+            registro.linhas = None if df_processed is None else len(df_processed)
+        st.caption(f"🗃️ Cache de leitura: {cache_leituras.acertos} acerto(s), {cache_leituras.falhas} falha(s)")
 
         if df_processed is not None:
+            chave_arquivo = hash_conteudo(uploaded_file.getvalue())
+            if df_processed.attrs.get('valores_invalidos'):
+                st.warning(f"{df_processed.attrs['valores_invalidos']} valor(es) não puderam ser convertidos e foram deixados em branco.")
             # Mostrar meses já importados
             st.markdown("### 📚 Meses já importados:")
             meses_existentes = carregar_referencias()
@@ -268,7 +149,8 @@ with aba_analise:
             if referencia_final in referencias_existentes:
                 st.error(f"⚠️ Referência **{referencia_final}** já foi importada. Exclua o período anterior antes de importar novamente.")
             else:
-                inserir_dados(df_processed, referencia_final)
+                with diagnostico.etapa('gravação no banco', linhas=len(df_processed)):
+                    inserir_dados(df_processed, referencia_final)
                 st.success(f"✅ Período **{referencia_final}** importado com sucesso!")
 
             
@@ -283,18 +165,14 @@ with aba_analise:
             else:
                 output_filename = 'receitas_despesas.xlsx'
 
-            # Usar tempfile para criar arquivo temporário
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                with pd.ExcelWriter(tmp_file.name, engine='xlsxwriter') as writer:
-                    df_processed.to_excel(writer, index=False)
-
-                with open(tmp_file.name, 'rb') as f:
-                    st.download_button(
-                        label="📥 Baixar Dados Processados em Excel",
-                        data=f.read(),
-                        file_name=output_filename,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+            with diagnostico.etapa('exportação da planilha'):
+                planilha_processada = exportar_excel(chave_arquivo, df_processed)
+            st.download_button(
+                label="📥 Baixar Dados Processados em Excel",
+                data=planilha_processada,
+                file_name=output_filename,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
             # Custom CSS to change the download button color
             st.markdown("""
@@ -322,42 +200,30 @@ with aba_analise:
                 ("Grupo", "Forma de Pagamento")
             )
 
+            # Todas as visões saem de um agrupamento feito uma vez por arquivo; trocar de opção só as exibe
+            with diagnostico.etapa('resumos da importação'):
+                resumos = resumos_importacao(chave_arquivo, df_processed)
+            colunas_resumo = {'grupo': 'Grupo', 'forma_pgto': 'Forma de Pgto.', 'tipo': 'Tipo', 'valor': 'Valor', 'percentual': '% do Total'}
+
             if menu_opcao == "Receita":
                 st.subheader("💰 Resumo de Receitas por Grupo")
-                resumo_receita = df_processed[df_processed['Tipo'] == 'Receita'].groupby('Grupo')['Valor'].sum().reset_index()
-                resumo_receita = resumo_receita.sort_values(by='Valor', ascending=False)
-                total_receita = resumo_receita['Valor'].sum()
-                resumo_receita['% do Total'] = resumo_receita['Valor'] / total_receita * 100
-                resumo_receita['Valor'] = resumo_receita['Valor'].apply(formatar_valor_brasileiro)
-                resumo_receita['% do Total'] = resumo_receita['% do Total'].apply(lambda x: f"{x:.2f}%")
-                st.dataframe(resumo_receita, use_container_width=True)
+                resumo_receita = resumos[('grupo', 'Receita')].rename(columns=colunas_resumo)
+                resumo_receita['Valor'] = formatar_valores_brasileiros(resumo_receita['Valor'])
+                st.dataframe(resumo_receita, use_container_width=True, column_config=COLUNAS_PERCENTUAL)
             else:
                 if menu_resumo == "Grupo":
                     st.subheader("💸 Resumo de Despesas por Grupo")
-                    resumo_despesa = df_processed[df_processed['Tipo'] == 'Despesa'].groupby('Grupo')['Valor'].sum().reset_index()
-                    resumo_despesa = resumo_despesa.sort_values(by='Valor', ascending=False)
-                    total_despesa = resumo_despesa['Valor'].sum()
-                    resumo_despesa['% do Total'] = resumo_despesa['Valor'] / total_despesa * 100
-                    resumo_despesa['Valor'] = resumo_despesa['Valor'].apply(formatar_valor_brasileiro)
-                    resumo_despesa['% do Total'] = resumo_despesa['% do Total'].apply(lambda x: f"{x:.2f}%")
-                    st.dataframe(resumo_despesa, use_container_width=True)
+                    resumo_despesa = resumos[('grupo', 'Despesa')].rename(columns=colunas_resumo)
+                    resumo_despesa['Valor'] = formatar_valores_brasileiros(resumo_despesa['Valor'])
+                    st.dataframe(resumo_despesa, use_container_width=True, column_config=COLUNAS_PERCENTUAL)
                 else:
                     st.subheader("💳 Resumo de Despesas por Forma de Pagamento")
-                    resumo_fp = (
-                        df_processed[df_processed['Tipo'] == 'Despesa']
-                        .groupby('Forma de Pgto.')['Valor']
-                        .sum()
-                        .reset_index()
-                        .sort_values(by='Valor', ascending=False)
-                    )
-                    total_despesa_fp = resumo_fp['Valor'].sum()
-                    resumo_fp['% do Total'] = resumo_fp['Valor'] / total_despesa_fp * 100
-                    resumo_fp['Valor'] = resumo_fp['Valor'].apply(formatar_valor_brasileiro)
-                    resumo_fp['% do Total'] = resumo_fp['% do Total'].apply(lambda x: f"{x:.2f}%")
-                    st.dataframe(resumo_fp, use_container_width=True)
+                    resumo_fp = resumos[('forma_pgto', 'Despesa')].rename(columns=colunas_resumo)
+                    resumo_fp['Valor'] = formatar_valores_brasileiros(resumo_fp['Valor'])
+                    st.dataframe(resumo_fp, use_container_width=True, column_config=COLUNAS_PERCENTUAL)
 
             st.subheader("📈 Resumo Total")
-            total_summary = df_processed.groupby('Tipo')['Valor'].sum().reset_index()
+            total_summary = resumos[('tipo', None)].drop(columns='percentual').rename(columns=colunas_resumo)
 
             # Salve os totais numéricos ANTES de formatar para string
             total_receitas = total_summary[total_summary['Tipo'] == 'Receita']['Valor'].sum()
@@ -365,7 +231,7 @@ with aba_analise:
             saldo = total_receitas - total_despesas
 
             # Formatar valores para exibição
-            total_summary['Valor'] = total_summary['Valor'].apply(formatar_valor_brasileiro)
+            total_summary['Valor'] = formatar_valores_brasileiros(total_summary['Valor'])
             st.dataframe(total_summary, use_container_width=True)
 
             # Destacar saldo com cor
@@ -373,134 +239,191 @@ with aba_analise:
             st.markdown(f"### <span style='color: {saldo_color}'>💰 Saldo Total (Receitas - Despesas): {formatar_valor_brasileiro(saldo)}</span>", unsafe_allow_html=True)
 
 with aba_historico:
-    referencias = carregar_referencias()
-    if referencias:
+    # Só a lista compacta de períodos é montada de início; gráficos e tabelas
+    # são calculados apenas para o período escolhido
+    with diagnostico.etapa('histórico: totais por período'):
+        totais_periodos = carregar_totais_por_periodo()
+    if not totais_periodos.empty:
         st.subheader("📅 Histórico de Períodos Importados")
-        
-        # Ordena as referências no formato mm/aaaa corretamente
-        def referencia_key(ref):
-            partes = ref.lower().split('/')
-            if len(partes) == 2 and partes[0] in MESES_REV:
-                return int(partes[1]) * 100 + int(MESES_REV[partes[0]])
-            return 0
 
+        st.dataframe(
+            pd.DataFrame({
+                'Período': totais_periodos['referencia'],
+                'Receitas': formatar_valores_brasileiros(totais_periodos['receitas']),
+                'Despesas': formatar_valores_brasileiros(totais_periodos['despesas']),
+                'Saldo': formatar_valores_brasileiros(totais_periodos['saldo']),
+                'Registros': totais_periodos['registros'],
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+        with st.expander("📑 Relatório consolidado em Excel"):
+            # Do mais antigo ao mais recente; referências sem período reconhecível ficam de fora
+            periodos_relatorio = {
+                referencia: periodo_da_referencia(referencia)
+                for referencia in reversed(totais_periodos['referencia'].tolist())
+                if periodo_da_referencia(referencia)
+            }
+            opcoes_relatorio = list(periodos_relatorio)
+            if opcoes_relatorio:
+                col_inicio, col_fim = st.columns(2)
+                with col_inicio:
+                    inicio_relatorio = st.selectbox("De", opcoes_relatorio, index=0, key="relatorio_inicio")
+                with col_fim:
+                    fim_relatorio = st.selectbox("Até", opcoes_relatorio, index=len(opcoes_relatorio) - 1, key="relatorio_fim")
+                com_dados = st.checkbox("Incluir a planilha com todos os lançamentos", value=True, key="relatorio_com_dados")
+                periodo_inicial, periodo_final = sorted((periodos_relatorio[inicio_relatorio], periodos_relatorio[fim_relatorio]))
+                parametros_relatorio = (periodo_inicial, periodo_final, com_dados)
+
+                if st.button("Gerar relatório", key="gerar_relatorio"):
+                    with st.spinner("Gerando relatório..."), diagnostico.etapa('relatório consolidado'):
+                        st.session_state['relatorio'] = (
+                            parametros_relatorio,
+                            gerar_relatorio(periodo_inicial, periodo_final, com_dados=com_dados),
+                        )
+                # O arquivo gerado fica na sessão enquanto a seleção não mudar
+                if st.session_state.get('relatorio', (None,))[0] == parametros_relatorio:
+                    st.download_button(
+                        label="📥 Baixar relatório consolidado",
+                        data=st.session_state['relatorio'][1],
+                        file_name=f"relatorio_{periodo_inicial}_{periodo_final}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+            else:
+                st.info("Nenhum período com data reconhecível para o relatório.")
+
+        ref = st.selectbox("🔎 Escolha o período para detalhar:", totais_periodos['referencia'].tolist(), key="periodo_historico")
+        with diagnostico.etapa('histórico: resumo do período'):
+            df_hist = carregar_resumo_por_referencia(ref)
+        st.markdown(f"#### 📊 Período: {ref}")
+        col1, col2 = st.columns([8, 2])
         
-        referencias_ordenadas = sorted(referencias, key=referencia_key, reverse=True)
+        with col2:
+            if st.button(f"🗑️ Excluir", key=f"del_{ref}", type="secondary"):
+                excluir_referencia(ref)
+                st.success(f"Período {ref} excluído com sucesso!")
+                st.rerun()
         
-        for ref in referencias_ordenadas:
-            with st.expander(f"📊 Período: {ref}", expanded=False):
-                col1, col2 = st.columns([8, 2])
-                
-                with col2:
-                    if st.button(f"🗑️ Excluir", key=f"del_{ref}", type="secondary"):
-                        excluir_referencia(ref)
-                        st.success(f"Período {ref} excluído com sucesso!")
-                        st.rerun()
+        with col1:
+            # Métricas principais
+            total_receitas_hist = df_hist[df_hist['tipo'] == 'Receita']['valor'].sum()
+            total_despesas_hist = df_hist[df_hist['tipo'] == 'Despesa']['valor'].sum()
+            saldo_hist = total_receitas_hist - total_despesas_hist
+            
+            col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+            with col_m1:
+                st.metric("📊 Total de Registros", df_hist['registros'].sum())
+            with col_m2:
+                st.metric("💰 Total Receitas", formatar_valor_brasileiro(total_receitas_hist))
+            with col_m3:
+                st.metric("💸 Total Despesas", formatar_valor_brasileiro(total_despesas_hist))
+            with col_m4:
+                delta_color = "normal" if saldo_hist >= 0 else "inverse"
+                st.metric("⚖️ Saldo", formatar_valor_brasileiro(saldo_hist), delta_color=delta_color)
+            
+            # Gráfico de comparação Receitas vs Despesas
+            consultas_hist = criar_consultas(df_hist, MOTOR_CONSULTAS)
+            resumo_tipos = consultas_hist.totais('tipo')
+            resumo_tipos['valor'] = resumo_tipos['valor'].astype(float) / 100  # centavos -> R$
+            if not resumo_tipos.empty:
+                fig_tipos = px.bar(
+                    resumo_tipos, 
+                    x='tipo', 
+                    y='valor',
+                    title=f"Receitas vs Despesas - {ref}",
+                    color='tipo',
+                    color_discrete_map={'Receita': '#2E8B57', 'Despesa': '#DC143C'}
+                )
+                fig_tipos.update_layout(showlegend=False, height=400)
+                fig_tipos.update_traces(texttemplate='%{y:,.0f}', textposition='outside')
+                with diagnostico.etapa('histórico: gráficos'):
+                    st.plotly_chart(fig_tipos, use_container_width=True)
+            
+            # Gráficos lado a lado para grupos
+            col_g1, col_g2 = st.columns(2)
+            
+            # Gráfico de despesas por grupo
+            with col_g1:
+                despesas_hist = df_hist[df_hist['tipo'] == 'Despesa']
+                if not despesas_hist.empty:
+                    grupo_desp = consultas_hist.totais('grupo', tipo='Despesa', limite=10)
+                    fig_desp = px.pie(
+                        values=grupo_desp['valor'].to_numpy(dtype=float) / 100,
+                        names=grupo_desp['grupo'],
+                        title="Top 10 Despesas por Grupo"
+                    )
+                    fig_desp.update_layout(height=400)
+                    with diagnostico.etapa('histórico: gráficos'):
+                        st.plotly_chart(fig_desp, use_container_width=True)
+            
+            # Gráfico de receitas por grupo
+            with col_g2:
+                receitas_hist = df_hist[df_hist['tipo'] == 'Receita']
+                if not receitas_hist.empty:
+                    # Os 10 maiores, do menor para o maior: o maior fica no topo das barras
+                    grupo_rec = consultas_hist.totais('grupo', tipo='Receita', limite=10).iloc[::-1]
+                    fig_rec = px.bar(
+                        x=grupo_rec['valor'].to_numpy(dtype=float) / 100,
+                        y=grupo_rec['grupo'],
+                        orientation='h',
+                        title="Top 10 Receitas por Grupo",
+                        color_discrete_sequence=['#2E8B57']
+                    )
+                    fig_rec.update_layout(
+                        height=400,
+                        xaxis_title="Valor (R$)",
+                        yaxis_title="Grupo"
+                    )
+                    fig_rec.update_traces(texttemplate='%{x:,.0f}', textposition='outside')
+                    with diagnostico.etapa('histórico: gráficos'):
+                        st.plotly_chart(fig_rec, use_container_width=True)
+            
+            # Tabela de Despesas por Grupo
+            if not despesas_hist.empty:
+                # stconv.subheader("📂 Despesas por Grupo")
+                st.subheader("📂 Despesas por Grupo")
+                df_grupo_despesas = consultas_hist.totais('grupo', tipo='Despesa')
+                df_grupo_despesas['valor_formatado'] = formatar_valores_brasileiros(df_grupo_despesas['valor'])
+                df_grupo_despesas['percentual'] = df_grupo_despesas['valor'] / df_grupo_despesas['valor'].sum() * 100
+
+                st.dataframe(
+                    df_grupo_despesas[['grupo', 'valor_formatado', 'percentual']].rename(columns={
+                        'grupo': 'Grupo',
+                        'valor_formatado': 'Valor',
+                        'percentual': 'Percentual'
+                    }),
+                    use_container_width=True,
+                    column_config=COLUNAS_PERCENTUAL
+                )
+
+            # Tabela detalhada de formas de pagamento (apenas para despesas)
+            if not despesas_hist.empty:
+                st.subheader("💳 Despesas por Forma de Pagamento")
+                df_forma_pgto = consultas_hist.totais('forma_pgto', tipo='Despesa')
+                df_forma_pgto['valor_formatado'] = formatar_valores_brasileiros(df_forma_pgto['valor'])
+                df_forma_pgto['percentual'] = df_forma_pgto['valor'] / df_forma_pgto['valor'].sum() * 100
                 
-                with col1:
-                    df_hist = carregar_dados_por_referencia(ref)
-                    
-                    # Métricas principais
-                    total_receitas_hist = df_hist[df_hist['tipo'] == 'Receita']['valor'].sum()
-                    total_despesas_hist = df_hist[df_hist['tipo'] == 'Despesa']['valor'].sum()
-                    saldo_hist = total_receitas_hist - total_despesas_hist
-                    
-                    col_m1, col_m2, col_m3, col_m4 = st.columns(4)
-                    with col_m1:
-                        st.metric("📊 Total de Registros", df_hist.shape[0])
-                    with col_m2:
-                        st.metric("💰 Total Receitas", formatar_valor_brasileiro(total_receitas_hist))
-                    with col_m3:
-                        st.metric("💸 Total Despesas", formatar_valor_brasileiro(total_despesas_hist))
-                    with col_m4:
-                        delta_color = "normal" if saldo_hist >= 0 else "inverse"
-                        st.metric("⚖️ Saldo", formatar_valor_brasileiro(saldo_hist), delta_color=delta_color)
-                    
-                    # Gráfico de comparação Receitas vs Despesas
-                    resumo_tipos = df_hist.groupby('tipo')['valor'].sum().reset_index()
-                    if not resumo_tipos.empty:
-                        fig_tipos = px.bar(
-                            resumo_tipos, 
-                            x='tipo', 
-                            y='valor',
-                            title=f"Receitas vs Despesas - {ref}",
-                            color='tipo',
-                            color_discrete_map={'Receita': '#2E8B57', 'Despesa': '#DC143C'}
-                        )
-                        fig_tipos.update_layout(showlegend=False, height=400)
-                        fig_tipos.update_traces(texttemplate='%{y:,.0f}', textposition='outside')
-                        st.plotly_chart(fig_tipos, use_container_width=True)
-                    
-                    # Gráficos lado a lado para grupos
-                    col_g1, col_g2 = st.columns(2)
-                    
-                    # Gráfico de despesas por grupo
-                    with col_g1:
-                        despesas_hist = df_hist[df_hist['tipo'] == 'Despesa']
-                        if not despesas_hist.empty:
-                            grupo_desp = despesas_hist.groupby('grupo')['valor'].sum().sort_values(ascending=False).head(10)
-                            fig_desp = px.pie(
-                                values=grupo_desp.values,
-                                names=grupo_desp.index,
-                                title="Top 10 Despesas por Grupo"
-                            )
-                            fig_desp.update_layout(height=400)
-                            st.plotly_chart(fig_desp, use_container_width=True)
-                    
-                    # Gráfico de receitas por grupo
-                    with col_g2:
-                        receitas_hist = df_hist[df_hist['tipo'] == 'Receita']
-                        if not receitas_hist.empty:
-                            grupo_rec = receitas_hist.groupby('grupo')['valor'].sum().sort_values(ascending=True).head(10)
-                            fig_rec = px.bar(
-                                x=grupo_rec.values,
-                                y=grupo_rec.index,
-                                orientation='h',
-                                title="Top 10 Receitas por Grupo",
-                                color_discrete_sequence=['#2E8B57']
-                            )
-                            fig_rec.update_layout(
-                                height=400,
-                                xaxis_title="Valor (R$)",
-                                yaxis_title="Grupo"
-                            )
-                            fig_rec.update_traces(texttemplate='%{x:,.0f}', textposition='outside')
-                            st.plotly_chart(fig_rec, use_container_width=True)
-                    
-                    # Tabela de Despesas por Grupo
-                    if not despesas_hist.empty:
-                        # stconv.subheader("📂 Despesas por Grupo")
-                        st.subheader("📂 Despesas por Grupo")
-                        grupo_despesas = despesas_hist.groupby('grupo')['valor'].sum().sort_values(ascending=False)
-                        df_grupo_despesas = grupo_despesas.reset_index()
-                        df_grupo_despesas['valor_formatado'] = df_grupo_despesas['valor'].apply(formatar_valor_brasileiro)
-                        df_grupo_despesas['percentual'] = (df_grupo_despesas['valor'] / df_grupo_despesas['valor'].sum() * 100).apply(lambda x: f"{x:.1f}%")
-
-                        st.dataframe(
-                            df_grupo_despesas[['grupo', 'valor_formatado', 'percentual']].rename(columns={
-                                'grupo': 'Grupo',
-                                'valor_formatado': 'Valor',
-                                'percentual': 'Percentual'
-                            }),
-                            use_container_width=True
-                        )
-
-                    # Tabela detalhada de formas de pagamento (apenas para despesas)
-                    if not despesas_hist.empty:
-                        st.subheader("💳 Despesas por Forma de Pagamento")
-                        forma_pgto = despesas_hist.groupby('forma_pgto')['valor'].sum().sort_values(ascending=False)
-                        df_forma_pgto = forma_pgto.reset_index()
-                        df_forma_pgto['valor_formatado'] = df_forma_pgto['valor'].apply(formatar_valor_brasileiro)
-                        df_forma_pgto['percentual'] = (df_forma_pgto['valor'] / df_forma_pgto['valor'].sum() * 100).apply(lambda x: f"{x:.1f}%")
-                        
-                        # Exibir tabela formatada
-                        st.dataframe(
-                            df_forma_pgto[['forma_pgto', 'valor_formatado', 'percentual']].rename(columns={
-                                'forma_pgto': 'Forma de Pagamento',
-                                'valor_formatado': 'Valor',
-                                'percentual': 'Percentual'
-                            }),
-                            use_container_width=True
-                        )
+                # Exibir tabela formatada
+                st.dataframe(
+                    df_forma_pgto[['forma_pgto', 'valor_formatado', 'percentual']].rename(columns={
+                        'forma_pgto': 'Forma de Pagamento',
+                        'valor_formatado': 'Valor',
+                        'percentual': 'Percentual'
+                    }),
+                    use_container_width=True,
+                    column_config=COLUNAS_PERCENTUAL
+                )
     else:
-        st.info("📋 Nenhum período importado ainda. Carregue um arquivo na aba 'Análise do Mês' para começar.")
\ No newline at end of file
+        st.info("📋 Nenhum período importado ainda. Carregue um arquivo na aba 'Análise do Mês' para começar.")
+
+# Painel opcional de diagnóstico: onde foi o tempo desta execução (até este ponto)
+with st.sidebar:
+    if st.toggle("🩺 Diagnóstico desta execução", key="diagnostico"):
+        st.caption(f"⏱️ Execução do script: {medicoes.decorrido() * 1000:.0f} ms")
+        st.dataframe(medicoes.tabela().round({'total_ms': 1}), hide_index=True, use_container_width=True)
+        st.dataframe(
+            pd.DataFrame(sorted(medicoes.contadores.items()), columns=['contador', 'quantidade']),
+            hide_index=True,
+            use_container_width=True
+        )
@@ -0,0 +1,75 @@
+"""
+Compara a leitura analítica de todo o histórico (só as colunas de agregação)
+pelo SQLite com a leitura do espelho Parquet (conselho_fiscal.colunar), e
+mede o backup e a restauração pelo arquivo colunar. Uso:
+
+    python -m benchmarks.bench_colunar --meses 60 240
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal import colunar
+from conselho_fiscal.banco import init_db, inserir_varios
+from conselho_fiscal.ingestao import process_excel_file
+
+COLUNAS = ['periodo', 'tipo', 'grupo', 'forma_pgto', 'valor']
+
+
+def _ler_sqlite(db_path, diretorio):
+    with sqlite3.connect(db_path) as conn:
+        return pd.read_sql_query(f"SELECT {', '.join(COLUNAS)} FROM dados", conn)
+
+
+def _ler_parquet(db_path, diretorio):
+    return colunar.ler_arquivo(diretorio, colunas=COLUNAS)
+
+
+CAMINHOS = {'sqlite': _ler_sqlite, 'parquet': _ler_parquet}
+
+
+def _melhor_tempo(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--meses', type=int, nargs='+', default=[60, 240])
+    parser.add_argument('--linhas', type=int, default=1_000, help="lançamentos por mês")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'meses':>6} {'operação':>22} {'tempo (ms)':>11} {'memória (MB)':>13}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'sintetica.xlsx')
+        gerar_planilha(arquivo, linhas=args.linhas)
+        mes = process_excel_file(arquivo)
+        for meses in args.meses:
+            db_path = os.path.join(diretorio, f'colunar_{meses}.db')
+            espelho = os.path.join(diretorio, f'espelho_{meses}')
+            init_db(db_path)
+            inserir_varios({f'{1 + i % 12:02d}/{2000 + i // 12}': mes for i in range(meses)}, db_path)
+
+            segundos, _ = _melhor_tempo(lambda: colunar.sincronizar(espelho, db_path), 1)
+            print(f"{meses:>6} {'backup (sincronizar)':>22} {segundos * 1000:>11.1f} {'':>13}")
+            for nome, ler in CAMINHOS.items():
+                segundos, df = _melhor_tempo(lambda: ler(db_path, espelho), args.repeticoes)
+                memoria = df.memory_usage(deep=True).sum() / 2**20
+                print(f"{meses:>6} {'leitura ' + nome:>22} {segundos * 1000:>11.1f} {memoria:>13.1f}")
+            segundos, _ = _melhor_tempo(lambda: colunar.restaurar(espelho, db_path), 1)
+            print(f"{meses:>6} {'restauração':>22} {segundos * 1000:>11.1f} {'':>13}")
+
+
+if __name__ == '__main__':
+    main()
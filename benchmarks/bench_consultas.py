@@ -0,0 +1,81 @@
+"""
+Compara os motores de conselho_fiscal.consultas nos resumos das abas
+(totais por tipo, por grupo e por forma de pagamento das despesas e os 10
+maiores itens): pandas e DuckDB sobre o DataFrame em memória, e DuckDB lendo
+direto um diretório Parquet no formato do espelho colunar. Mede também
+resumir(), que monta as tabelas da aba de importação num só agrupamento. Uso:
+
+    python -m benchmarks.bench_consultas --linhas 10000 1000000 10000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from conselho_fiscal.consultas import DUCKDB_DISPONIVEL, ConsultasDuckDB, ConsultasPandas, resumir
+
+
+def _gerar_dados(linhas, semente=0):
+    """`linhas` lançamentos no formato de `dados`, com 100 grupos, 10 formas e 5.000 itens."""
+    aleatorio = np.random.default_rng(semente)
+    grupos = np.array([f'Grupo {g}' for g in range(100)], dtype=object)
+    formas = np.array([f'Forma {f}' for f in range(10)], dtype=object)
+    itens = np.array([f'Item {i}' for i in range(5_000)], dtype=object)
+    return pd.DataFrame({
+        'tipo': np.where(aleatorio.random(linhas) < 0.5, 'Receita', 'Despesa'),
+        'grupo': grupos[aleatorio.integers(0, len(grupos), linhas)],
+        'forma_pgto': formas[aleatorio.integers(0, len(formas), linhas)],
+        'item': itens[aleatorio.integers(0, len(itens), linhas)],
+        'valor': aleatorio.integers(1, 5_000_000, linhas),
+    })
+
+
+def _resumos(consultas):
+    """As consultas de resumo que as abas fazem."""
+    consultas.totais('tipo')
+    consultas.totais('grupo', tipo='Despesa')
+    consultas.totais('forma_pgto', tipo='Despesa')
+    consultas.totais('item', limite=10)
+
+
+def _melhor_tempo(funcao, consultas, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(consultas)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+    if not DUCKDB_DISPONIVEL:
+        print("duckdb não está instalado: só o motor pandas será medido")
+
+    print(f"{'linhas':>11} {'motor':>16} {'resumos (ms)':>13} {'resumir (ms)':>13}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in args.linhas:
+            df = _gerar_dados(linhas)
+            motores = {'pandas': ConsultasPandas(df)}
+            if DUCKDB_DISPONIVEL:
+                particao = os.path.join(diretorio, f'espelho_{linhas}', 'periodo=202501')
+                os.makedirs(particao)
+                df.to_parquet(os.path.join(particao, 'dados.parquet'), index=False)
+                motores['duckdb (frame)'] = ConsultasDuckDB(df)
+                motores['duckdb (parquet)'] = ConsultasDuckDB(os.path.dirname(particao))
+            for nome, consultas in motores.items():
+                resumos = _melhor_tempo(_resumos, consultas, args.repeticoes)
+                agrupado = _melhor_tempo(resumir, consultas, args.repeticoes)
+                print(f"{linhas:>11} {nome:>16} {resumos * 1000:>13.1f} {agrupado * 1000:>13.1f}")
+            del df, motores
+
+
+if __name__ == '__main__':
+    main()
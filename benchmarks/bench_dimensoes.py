@@ -0,0 +1,119 @@
+"""
+Compara o formato antigo da tabela dados (uma linha com todos os textos) com
+fatos + tabelas de dimensão: espaço das tabelas e índices dos lançamentos
+(resumo_mensal fora), memória de um período lido
+(texto x Categorical) e tempo dos groupbys da aba Histórico sobre ele. O
+banco antigo é migrado por init_db, como aconteceria em produção.
+
+Cada mês tem os próprios itens, como nos demonstrativos reais, de modo que
+dim_item cresce com o histórico; a memória de um período lido deve ficar
+estável com mais --meses. Uso:
+
+    python -m benchmarks.bench_dimensoes --meses 12 60 120
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.banco import (
+    COLUNAS_PLANILHA,
+    SQL_CRIAR_DADOS_LEGADO,
+    carregar_dados_por_referencia,
+    init_db,
+)
+from conselho_fiscal.ingestao import process_excel_file
+
+
+def _banco_legado(db_path, mes, meses):
+    """
+    Banco no formato anterior às dimensões, com `meses` cópias do mês lido;
+    em cada cópia o Item leva a referência, para que nenhum item se repita
+    entre meses.
+    """
+    registros = list(zip(*(mes[coluna].to_numpy(dtype=object, na_value=None) for coluna in COLUNAS_PLANILHA)))
+    posicao_item = COLUNAS_PLANILHA.index('Item')
+    linhas = []
+    for i in range(meses):
+        referencia = f'{1 + i % 12:02d}/{2000 + i // 12}'
+        periodo = (2000 + i // 12) * 100 + 1 + i % 12
+        for registro in registros:
+            registro = list(registro)
+            registro[posicao_item] = f'{registro[posicao_item]} - {referencia}'
+            linhas.append((referencia, periodo, *registro))
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(SQL_CRIAR_DADOS_LEGADO)
+        for colunas in ['referencia, periodo', 'periodo, tipo, grupo', 'periodo, tipo, forma_pgto']:
+            conn.execute(f"CREATE INDEX idx_dados_{colunas.replace(', ', '_')} ON dados ({colunas})")
+        conn.executemany("""
+            INSERT INTO dados (referencia, periodo, tipo, grupo, item, competencia, liquidacao, documento, forma_pgto, valor)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, linhas)
+
+
+def _tamanho_mb(db_path):
+    """Páginas ocupadas pelos lançamentos: dados ou fatos e dimensões, com seus índices."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        (paginas,) = conn.execute("""
+            SELECT SUM(pgsize) FROM dbstat
+            WHERE name NOT IN ('sqlite_schema', 'sqlite_sequence', 'controle') AND name NOT LIKE '%resumo%'
+        """).fetchone()
+    return paginas / 2**20
+
+
+def _agregados(df):
+    """Os agrupamentos que a aba Histórico fazia sobre as linhas de um período."""
+    despesas = df[df['tipo'] == 'Despesa']
+    df.groupby('tipo', observed=True)['valor'].sum()
+    despesas.groupby('grupo', observed=True)['valor'].sum()
+    despesas.groupby('forma_pgto', observed=True)['valor'].sum()
+    df.groupby('item', observed=True)['valor'].sum()
+
+
+def _melhor_tempo(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--meses', type=int, nargs='+', default=[12, 60, 120])
+    parser.add_argument('--linhas', type=int, default=10_000, help="lançamentos por mês")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'meses':>6} {'formato':>12} {'espaço (MB)':>13} {'período (MB)':>13} {'groupbys (ms)':>14}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'sintetica.xlsx')
+        gerar_planilha(arquivo, linhas=args.linhas)
+        mes = process_excel_file(arquivo)
+        for meses in args.meses:
+            legado = os.path.join(diretorio, f'legado_{meses}.db')
+            migrado = os.path.join(diretorio, f'dimensoes_{meses}.db')
+            _banco_legado(legado, mes, meses)
+            shutil.copy(legado, migrado)
+            init_db(migrado)
+
+            with sqlite3.connect(legado) as conn:
+                texto = pd.read_sql_query("SELECT * FROM dados WHERE referencia = '01/2000'", conn)
+            categorias = carregar_dados_por_referencia('01/2000', migrado)
+            for nome, db_path, df in [('texto', legado, texto), ('dimensões', migrado, categorias)]:
+                memoria = df.memory_usage(deep=True).sum() / 2**20
+                segundos = _melhor_tempo(lambda: _agregados(df), args.repeticoes)
+                print(f"{meses:>6} {nome:>12} {_tamanho_mb(db_path):>13.1f} {memoria:>13.2f} {segundos * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Compara a montagem das tabelas de resumo por grupo com milhares de grupos:
+valores formatados linha a linha com .apply e percentuais como texto (como
+era antes) contra formatar_valores_brasileiros e percentuais numéricos com
+column_config. Mede a formatação e a chamada de st.dataframe, que serializa
+a tabela para o navegador (executada fora de um servidor Streamlit). Uso:
+
+    python -m benchmarks.bench_formatacao --grupos 1000 10000 100000
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from conselho_fiscal.formatacao import formatar_valor_brasileiro, formatar_valores_brasileiros
+
+COLUNAS_PERCENTUAL = {'% do Total': st.column_config.NumberColumn(format="%.2f%%")}
+
+
+def _resumo(grupos, semente=0):
+    """Totais por grupo (centavos) no formato devolvido por consultas.totais."""
+    aleatorio = np.random.default_rng(semente)
+    resumo = pd.DataFrame({
+        'Grupo': [f'Grupo {g}' for g in range(grupos)],
+        'Valor': pd.array(aleatorio.integers(1, 10**11, grupos), dtype='Int64'),
+    })
+    resumo['% do Total'] = resumo['Valor'] / resumo['Valor'].sum() * 100
+    return resumo
+
+
+def _por_linha(resumo):
+    resumo = resumo.copy()
+    resumo['Valor'] = resumo['Valor'].apply(formatar_valor_brasileiro)
+    resumo['% do Total'] = resumo['% do Total'].apply(lambda x: f"{x:.2f}%")
+    return resumo, {}
+
+
+def _vetorizada(resumo):
+    resumo = resumo.copy()
+    resumo['Valor'] = formatar_valores_brasileiros(resumo['Valor'])
+    return resumo, COLUNAS_PERCENTUAL
+
+
+CAMINHOS = {'por linha': _por_linha, 'vetorizada': _vetorizada}
+
+
+def _melhor_tempo(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--grupos', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+    # Fora do `streamlit run` cada chamada avisa que não há contexto de execução
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(lambda registro: False)
+
+    print(f"{'grupos':>8} {'formatação':>11} {'formatar (ms)':>14} {'st.dataframe (ms)':>18}")
+    for grupos in args.grupos:
+        resumo = _resumo(grupos)
+        for nome, formatar in CAMINHOS.items():
+            formatar_s, (tabela, column_config) = _melhor_tempo(lambda: formatar(resumo), args.repeticoes)
+            exibir_s, _ = _melhor_tempo(lambda: st.dataframe(tabela, column_config=column_config), args.repeticoes)
+            print(f"{grupos:>8} {nome:>11} {formatar_s * 1000:>14.1f} {exibir_s * 1000:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
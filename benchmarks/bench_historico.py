@@ -0,0 +1,79 @@
+"""
+Compara o carregamento da aba Histórico com uma consulta por período
+(carregar_referencias + carregar_dados_por_referencia, agregando as linhas
+brutas em pandas) com a consulta única ao resumo_mensal (carregar_historico).
+Uso:
+
+    python -m benchmarks.bench_historico --meses 12 60 240
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.banco import (
+    carregar_dados_por_referencia,
+    carregar_historico,
+    carregar_referencias,
+    init_db,
+    inserir_varios,
+)
+from conselho_fiscal.ingestao import process_excel_file
+
+
+def _totais(df):
+    """Os agregados que a aba Histórico mostra para cada período."""
+    despesas = df[df['tipo'] == 'Despesa']
+    return (
+        df.groupby('tipo', observed=True)['valor'].sum(),
+        despesas.groupby('grupo', observed=True)['valor'].sum(),
+        df[df['tipo'] == 'Receita'].groupby('grupo', observed=True)['valor'].sum(),
+        despesas.groupby('forma_pgto', observed=True)['valor'].sum(),
+    )
+
+
+def _uma_consulta_por_periodo(db_path):
+    return {ref: carregar_dados_por_referencia(ref, db_path) for ref in carregar_referencias(db_path)}
+
+
+CAMINHOS = {'por período': _uma_consulta_por_periodo, 'consulta única': carregar_historico}
+
+
+def _medir(carregar, db_path, repeticoes):
+    """Melhores tempos (s) da carga sozinha e da carga seguida dos agregados da aba."""
+    carga, total = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        periodos = carregar(db_path)
+        carga.append(time.perf_counter() - inicio)
+        for df in periodos.values():
+            _totais(df)
+        total.append(time.perf_counter() - inicio)
+    return min(carga), min(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--meses', type=int, nargs='+', default=[12, 60, 240])
+    parser.add_argument('--linhas', type=int, default=1_000, help="lançamentos por mês")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'meses':>6} {'caminho':>15} {'carga (ms)':>11} {'carga + agregados (ms)':>23}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'sintetica.xlsx')
+        gerar_planilha(arquivo, linhas=args.linhas)
+        mes = process_excel_file(arquivo)
+        for meses in args.meses:
+            db_path = os.path.join(diretorio, f'historico_{meses}.db')
+            init_db(db_path)
+            inserir_varios({f'{1 + i % 12:02d}/{2000 + i // 12}': mes for i in range(meses)}, db_path)
+            for nome, carregar in CAMINHOS.items():
+                carga, total = _medir(carregar, db_path, args.repeticoes)
+                print(f"{meses:>6} {nome:>15} {carga * 1000:>11.1f} {total * 1000:>23.1f}")
+
+
+if __name__ == '__main__':
+    main()
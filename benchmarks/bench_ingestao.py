@@ -0,0 +1,72 @@
+"""
+Compara a leitura com pd.read_excel com a leitura em streaming (read_sections).
+
+Cada caminho roda em um processo separado para que o pico de memória (RSS)
+de um não contamine o do outro. Uso:
+
+    python -m benchmarks.bench_ingestao --linhas 10000 50000
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.planilha_sintetica import gerar_planilha
+
+
+def _ler_com_read_excel(caminho):
+    import pandas as pd
+    df = pd.read_excel(caminho)
+    primeira_coluna = df.iloc[:, 0].astype(str).str.strip()
+    inicio = primeira_coluna[primeira_coluna == 'Receitas'].index[0]
+    fim = primeira_coluna[primeira_coluna == 'Despesas'].index[0]
+    return df.iloc[inicio + 1:fim].copy(), df.iloc[fim + 1:].copy()
+
+
+def _ler_com_streaming(caminho):
+    from conselho_fiscal.ingestao import read_sections
+    return read_sections(caminho)
+
+
+CAMINHOS = {'read_excel': _ler_com_read_excel, 'streaming': _ler_com_streaming}
+
+
+def _medir(caminho_leitura, arquivo):
+    """Executa no processo filho e imprime 'segundos pico_kb'."""
+    import pandas  # noqa: F401  (fora da medição de tempo, igual nos dois caminhos)
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    CAMINHOS[caminho_leitura](arquivo)
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{segundos} {pico - rss_base}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 50_000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'caminho':>11} {'tempo (s)':>10} {'pico RSS (MB)':>14}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in args.linhas:
+            arquivo = os.path.join(diretorio, f'sintetica_{linhas}.xlsx')
+            gerar_planilha(arquivo, linhas=linhas)
+            for caminho_leitura in CAMINHOS:
+                saida = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_ingestao', '--medir', caminho_leitura, arquivo],
+                    capture_output=True, text=True, check=True,
+                ).stdout.split()
+                segundos, pico_kb = float(saida[0]), int(saida[1])
+                print(f"{linhas:>8} {caminho_leitura:>11} {segundos:>10.2f} {pico_kb / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--medir':
+        _medir(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,68 @@
+"""
+Compara a gravação de um mês no banco via DataFrame.to_sql (caminho antigo de
+inserir_dados) com a gravação em massa atual (executemany numa transação, WAL
+e synchronous=NORMAL). Cada medição usa um banco novo em disco. Uso:
+
+    python -m benchmarks.bench_insercao --linhas 10000 100000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.banco import init_db, inserir_dados
+from conselho_fiscal.ingestao import process_excel_file
+
+
+def _inserir_com_to_sql(df, referencia, db_path):
+    # `dados` agora é uma view sobre fatos e dimensões: o caminho antigo grava numa tabela plana à parte
+    conn = sqlite3.connect(db_path)
+    df = df.copy()
+    df['referencia'] = referencia
+    df = df[['referencia', 'Tipo', 'Grupo', 'Item', 'Competência', 'Liquidação', 'Documento', 'Forma de Pgto.', 'Valor']]
+    df.columns = ['referencia', 'tipo', 'grupo', 'item', 'competencia', 'liquidacao', 'documento', 'forma_pgto', 'valor']
+    df.to_sql('dados_to_sql', conn, if_exists='append', index=False)
+    conn.close()
+
+
+CAMINHOS = {'to_sql': _inserir_com_to_sql, 'executemany': inserir_dados}
+
+
+def _medir(inserir, df, diretorio, repeticoes):
+    """Melhor tempo, em segundos, de `repeticoes` gravações em bancos novos."""
+    tempos = []
+    for i in range(repeticoes):
+        db_path = os.path.join(diretorio, f'bench_{inserir.__name__}_{i}.db')
+        init_db(db_path)
+        inicio = time.perf_counter()
+        inserir(df, 'bench', db_path)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'caminho':>12} {'tempo (s)':>10} {'linhas/s':>10}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'sintetica.xlsx')
+        gerar_planilha(arquivo, linhas=min(args.linhas))
+        mes = process_excel_file(arquivo)
+        for linhas in args.linhas:
+            # Replica o mês lido até o tamanho pedido, sem reprocessar planilhas grandes
+            df = pd.concat([mes] * -(-linhas // len(mes)), ignore_index=True).iloc[:linhas]
+            for nome, inserir in CAMINHOS.items():
+                segundos = _medir(inserir, df, diretorio, args.repeticoes)
+                print(f"{linhas:>8} {nome:>12} {segundos:>10.3f} {linhas / segundos:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara o relatório consolidado montado em pandas (todas as linhas do
+intervalo carregadas, pivot_table e to_excel) com gerar_relatorio, que
+calcula as tabelas em SQL e grava as linhas direto do cursor. Uso:
+
+    python -m benchmarks.bench_relatorio --meses 12 60
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.banco import init_db, inserir_varios
+from conselho_fiscal.exportacao import gerar_relatorio
+from conselho_fiscal.ingestao import process_excel_file
+
+
+def _relatorio_pandas(db_path):
+    """O mesmo relatório, com todo o histórico carregado num DataFrame."""
+    with sqlite3.connect(db_path) as conn:
+        df = pd.read_sql_query("SELECT * FROM dados ORDER BY periodo, id", conn)
+    df['valor'] = df['valor'] / 100
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        df.drop(columns=['id', 'periodo']).to_excel(writer, sheet_name='Dados', index=False)
+        for dimensao, nome in [('grupo', 'Por grupo'), ('forma_pgto', 'Por forma de pgto.')]:
+            pivo = df.pivot_table(index=['tipo', dimensao], columns='periodo', values='valor', aggfunc='sum', observed=True)
+            pivo.assign(total=pivo.sum(axis=1)).to_excel(writer, sheet_name=nome)
+        tendencia = df.pivot_table(index='periodo', columns='tipo', values='valor', aggfunc='sum', observed=True)
+        tendencia['saldo'] = tendencia['Receita'] - tendencia['Despesa']
+        tendencia['saldo_acumulado'] = tendencia['saldo'].cumsum()
+        tendencia.to_excel(writer, sheet_name='Tendência mensal')
+    return buffer.getvalue()
+
+
+CAMINHOS = {
+    'pandas': _relatorio_pandas,
+    'sql + streaming': lambda db_path: gerar_relatorio(0, 999999, db_path=db_path),
+    'sql sem Dados': lambda db_path: gerar_relatorio(0, 999999, com_dados=False, db_path=db_path),
+}
+
+
+def _medir(gerar, db_path):
+    """Tempo (s) e pico de memória (MB) de uma geração do relatório."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    gerar(db_path)
+    segundos = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--meses', type=int, nargs='+', default=[12, 60])
+    parser.add_argument('--linhas', type=int, default=1_000, help="lançamentos por mês")
+    args = parser.parse_args()
+
+    print(f"{'meses':>6} {'caminho':>16} {'tempo (s)':>10} {'pico (MB)':>10}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'sintetica.xlsx')
+        gerar_planilha(arquivo, linhas=args.linhas)
+        mes = process_excel_file(arquivo)
+        for meses in args.meses:
+            db_path = os.path.join(diretorio, f'relatorio_{meses}.db')
+            init_db(db_path)
+            inserir_varios({f'{1 + i % 12:02d}/{2000 + i // 12}': mes for i in range(meses)}, db_path)
+            for nome, gerar in CAMINHOS.items():
+                segundos, pico = _medir(gerar, db_path)
+                print(f"{meses:>6} {nome:>16} {segundos:>10.2f} {pico:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Compara o DataFrame de process_excel_file com as colunas repetitivas em texto
+(como era antes) e como Categorical: memória, custo da conversão na leitura e
+tempo dos resumos da aba de importação (totais por tipo, grupo e forma de
+pagamento, 10 maiores itens e mês de referência). Uso:
+
+    python -m benchmarks.bench_tipos --linhas 20000 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.consultas import ConsultasPandas
+from conselho_fiscal.ingestao import COLUNAS_CATEGORICAS, process_excel_file
+from conselho_fiscal.referencias import extrair_referencia_padronizada
+
+
+def _resumos(df):
+    """Os resumos que a aba de importação calcula sobre a planilha enviada."""
+    consultas = ConsultasPandas(df)
+    consultas.totais('tipo')
+    consultas.totais('grupo', tipo='Receita')
+    consultas.totais('grupo', tipo='Despesa')
+    consultas.totais('forma_pgto', tipo='Despesa')
+    consultas.totais('item', limite=10)
+    extrair_referencia_padronizada(df)
+
+
+def _melhor_tempo(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[20_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>8} {'colunas':>12} {'memória (MB)':>13} {'conversão (ms)':>15} {'resumos (ms)':>13}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in args.linhas:
+            arquivo = os.path.join(diretorio, f'sintetica_{linhas}.xlsx')
+            gerar_planilha(arquivo, linhas=linhas)
+            categorias = process_excel_file(arquivo)
+            texto = categorias.astype({coluna: 'str' for coluna in COLUNAS_CATEGORICAS})
+            conversao = _melhor_tempo(lambda: texto[COLUNAS_CATEGORICAS].astype('category'), args.repeticoes)
+            for nome, df, custo in [('texto', texto, ''), ('Categorical', categorias, f'{conversao * 1000:.1f}')]:
+                memoria = df.memory_usage(deep=True).sum() / 2**20
+                segundos = _melhor_tempo(lambda: _resumos(df), args.repeticoes)
+                print(f"{len(df):>8} {nome:>12} {memoria:>13.2f} {custo:>15} {segundos * 1000:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Gera planilhas sintéticas no layout esperado por process_excel_file. Também
+pode ser usado sozinho:
+
+    python -m benchmarks.planilha_sintetica sintetica.xlsx --linhas 50000
+"""
+
+import argparse
+import random
+
+import openpyxl
+
+
+def _valor_brasileiro(valor):
+    return f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def gerar_planilha(caminho, linhas=10_000, itens_por_grupo=50, semente=0, competencia='01/2025'):
+    """
+    Grava em `caminho` um demonstrativo com aproximadamente `linhas` lançamentos,
+    divididos igualmente entre receitas e despesas e agrupados em grupos de
+    `itens_por_grupo` itens, cada grupo com sua linha de cabeçalho e de Total.
+    `competencia` (mm/aaaa) define o mês dos lançamentos.
+    """
+    aleatorio = random.Random(semente)
+    workbook = openpyxl.Workbook(write_only=True)
+    planilha = workbook.create_sheet()
+    planilha.append(['Demonstrativo de Receitas e Despesas'])
+
+    def valor():
+        numero = aleatorio.randint(1, 5_000_000) / 100
+        if aleatorio.random() < 0.5:
+            return numero
+        texto = _valor_brasileiro(numero)
+        return f"({texto})" if aleatorio.random() < 0.05 else texto
+
+    n_grupos = max(1, linhas // 2 // itens_por_grupo)
+    planilha.append(['Receitas'])
+    for g in range(n_grupos):
+        planilha.append([f'Receita {g}'])
+        for i in range(itens_por_grupo):
+            dia = aleatorio.randint(1, 28)
+            planilha.append([f'Receita {g}.{i}', competencia, f'{dia:02d}/{competencia}', None, valor(), 'Conta Corrente'])
+        planilha.append([f'Total Receita {g}'])
+    planilha.append(['Despesas'])
+    for g in range(n_grupos):
+        planilha.append([f'Despesa {g}'])
+        for i in range(itens_por_grupo):
+            dia = aleatorio.randint(1, 28)
+            forma = aleatorio.choice(['Boleto', 'PIX', 'Transferência', None])
+            planilha.append([f'Despesa {g}.{i}', competencia, f'{dia:02d}/{competencia}', f'NF {i}', forma, 'Conta Corrente', valor()])
+        planilha.append([f'Total Despesa {g}'])
+    workbook.save(caminho)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('saida', help="arquivo .xlsx a gravar")
+    parser.add_argument('--linhas', type=int, default=10_000)
+    parser.add_argument('--itens-por-grupo', type=int, default=50)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--competencia', default='01/2025', help="mês dos lançamentos (mm/aaaa)")
+    args = parser.parse_args(argv)
+    gerar_planilha(args.saida, args.linhas, args.itens_por_grupo, args.semente, args.competencia)
+
+
+if __name__ == '__main__':
+    main()
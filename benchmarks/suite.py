@@ -0,0 +1,188 @@
+"""
+Roda todas as etapas do fluxo sobre planilhas sintéticas e grava os tempos em
+JSON, para acompanhar regressões entre versões: leitura (process_excel_file),
+gravação de cada mês (inserir_dados), carga do histórico (fria, logo após a
+gravação, e repetida, servida pelo cache), resumos da aba de importação e
+exportação (planilha processada e relatório consolidado). Uso:
+
+    python -m benchmarks.suite --linhas 1000 10000 --meses 12 --saida resultados.json
+    python -m benchmarks.suite --comparar base.json --saida atual.json
+
+Com --comparar, cada etapa é comparada com a mesma etapa, tamanho e número de
+meses do arquivo base, e o comando sai com 1 se alguma ficou mais lenta que a --tolerancia.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.banco import (
+    carregar_dados_por_referencia,
+    carregar_historico,
+    carregar_totais_por_periodo,
+    init_db,
+    inserir_dados,
+)
+from conselho_fiscal.consultas import ConsultasPandas, resumir
+from conselho_fiscal.exportacao import gerar_excel, gerar_relatorio
+from conselho_fiscal.ingestao import process_excel_file
+
+
+def _tempos(funcao, repeticoes):
+    """Tempos (s) de `repeticoes` execuções e o resultado da última."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, resultado
+
+
+def _registro(etapa, linhas, tempos, **extras):
+    return {
+        'etapa': etapa,
+        'linhas': linhas,
+        'segundos': min(tempos),
+        'mediana': float(np.median(tempos)),
+        'repeticoes': len(tempos),
+        **extras,
+    }
+
+
+def _ambiente():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'nucleos': os.cpu_count(),
+    }
+
+
+def medir_tamanho(diretorio, linhas, meses, repeticoes):
+    """Registros de todas as etapas para planilhas de ~`linhas` lançamentos."""
+    arquivo = os.path.join(diretorio, f'sintetica_{linhas}.xlsx')
+    gerar_planilha(arquivo, linhas=linhas)
+    registros = []
+
+    tempos, df = _tempos(lambda: process_excel_file(arquivo), repeticoes)
+    n = len(df)
+    registros.append(_registro('leitura', n, tempos, memoria_mb=df.memory_usage(deep=True).sum() / 2**20))
+
+    tempos, _ = _tempos(lambda: resumir(ConsultasPandas(df)), repeticoes)
+    registros.append(_registro('resumos_importacao', n, tempos))
+
+    tempos, _ = _tempos(lambda: gerar_excel(df), repeticoes)
+    registros.append(_registro('exportacao_planilha', n, tempos))
+
+    # Um mês por vez, como na aba de importação; cada gravação é uma repetição
+    db_path = os.path.join(diretorio, f'suite_{linhas}.db')
+    init_db(db_path)
+    referencias = [f'{1 + i % 12:02d}/{2000 + i // 12}' for i in range(meses)]
+    tempos = []
+    for referencia in referencias:
+        inicio = time.perf_counter()
+        inserir_dados(df, referencia, db_path)
+        tempos.append(time.perf_counter() - inicio)
+    registros.append(_registro('gravacao_mes', n, tempos, meses=meses))
+
+    # A gravação acabou de invalidar o cache: a primeira carga vai ao banco
+    for etapa, carregar in [
+        ('historico_totais', lambda: carregar_totais_por_periodo(db_path)),
+        ('historico_resumos', lambda: carregar_historico(db_path)),
+        ('historico_lancamentos', lambda: carregar_dados_por_referencia(referencias[-1], db_path)),
+    ]:
+        fria, _ = _tempos(carregar, 1)
+        registros.append(_registro(f'{etapa}_fria', n, fria, meses=meses))
+        com_cache, _ = _tempos(carregar, repeticoes)
+        registros.append(_registro(f'{etapa}_cache', n, com_cache, meses=meses))
+
+    tempos, _ = _tempos(lambda: gerar_relatorio(200001, 209912, com_dados=True, db_path=db_path), repeticoes)
+    registros.append(_registro('exportacao_relatorio', n, tempos, meses=meses))
+    return registros
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Linhas (etapa, linhas, base, atual, razão) para as etapas medidas nos dois
+    arquivos com o mesmo tamanho (e número de meses, nas que dependem dele) e
+    se alguma ficou mais lenta que 1 + `tolerancia`.
+    """
+    def chave(registro):
+        return registro['etapa'], registro['linhas'], registro.get('meses')
+
+    anteriores = {chave(registro): registro['segundos'] for registro in base['resultados']}
+    linhas, regressao = [], False
+    for registro in resultados:
+        if chave(registro) not in anteriores:
+            continue
+        antes = anteriores[chave(registro)]
+        razao = registro['segundos'] / antes if antes else float('inf')
+        regressao |= razao > 1 + tolerancia
+        linhas.append((registro['etapa'], registro['linhas'], antes, registro['segundos'], razao))
+    return linhas, regressao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000, 10_000], help="lançamentos por planilha")
+    parser.add_argument('--meses', type=int, default=12, help="meses gravados para o histórico")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--saida', help="arquivo JSON de resultados (padrão: saída padrão)")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.2, help="aumento de tempo aceito no --comparar (padrão: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in args.linhas:
+            for registro in medir_tamanho(diretorio, linhas, args.meses, args.repeticoes):
+                resultados.append(registro)
+                print(f"{registro['linhas']:>8} {registro['etapa']:>28} {registro['segundos'] * 1000:>11.1f} ms", file=sys.stderr)
+
+    documento = {
+        'ambiente': _ambiente(),
+        'parametros': {'linhas': args.linhas, 'meses': args.meses, 'repeticoes': args.repeticoes},
+        'resultados': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(documento, arquivo, ensure_ascii=False, indent=2)
+    else:
+        json.dump(documento, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    if not args.comparar:
+        return 0
+    with open(args.comparar, encoding='utf-8') as arquivo:
+        linhas, regressao = comparar(resultados, json.load(arquivo), args.tolerancia)
+    print(f"\n{'linhas':>8} {'etapa':>28} {'base (ms)':>10} {'atual (ms)':>11} {'razão':>6}", file=sys.stderr)
+    for etapa, n, antes, agora, razao in linhas:
+        marca = '  <- mais lenta' if razao > 1 + args.tolerancia else ''
+        print(f"{n:>8} {etapa:>28} {antes * 1000:>10.1f} {agora * 1000:>11.1f} {razao:>6.2f}{marca}", file=sys.stderr)
+    return 1 if regressao else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""Núcleo de leitura e armazenamento dos demonstrativos do conselho fiscal."""
+
+import importlib
+
+# Nome exportado -> módulo que o define. Os módulos só são importados no primeiro
+# acesso, para que `python -m conselho_fiscal` não carregue pandas sem precisar
+_EXPORTADOS = {
+    'DB_PATH': 'banco',
+    'carregar_dados_por_referencia': 'banco',
+    'carregar_referencias': 'banco',
+    'excluir_referencia': 'banco',
+    'excluir_todos': 'banco',
+    'init_db': 'banco',
+    'inserir_dados': 'banco',
+    'gerar_excel': 'exportacao',
+    'gerar_relatorio': 'exportacao',
+    'formatar_valor_brasileiro': 'formatacao',
+    'PlanilhaInvalidaError': 'ingestao',
+    'process_excel_file': 'ingestao',
+    'extrair_referencia_padronizada': 'referencias',
+}
+
+__all__ = list(_EXPORTADOS)
+
+
+def __getattr__(nome):
+    if nome not in _EXPORTADOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(f"{__name__}.{_EXPORTADOS[nome]}"), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
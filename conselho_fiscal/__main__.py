@@ -0,0 +1,9 @@
+"""Permite rodar a linha de comando com `python -m conselho_fiscal` (ver conselho_fiscal.cli)."""
+
+import sys
+
+from conselho_fiscal.cli import main
+
+# Protegido: os processos do lote (spawn) importam este módulo de novo
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,610 @@
+"""Armazenamento dos demonstrativos importados em SQLite."""
+
+import itertools
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from conselho_fiscal import diagnostico
+from conselho_fiscal.referencias import periodo_da_referencia
+
+DB_PATH = "dados_conselho_fiscal.db"
+
+# Colunas de texto repetitivo guardadas em tabelas de dimensão (dim_<coluna>: id, nome);
+# `fatos` guarda só as chaves inteiras, e a view `dados` remonta as linhas com os nomes
+DIMENSOES = ('referencia', 'tipo', 'grupo', 'item', 'forma_pgto')
+# As de poucos valores distintos, lidas como Categorical; item é texto livre e chega como texto
+DIMENSOES_CATEGORICAS = ('referencia', 'tipo', 'grupo', 'forma_pgto')
+
+# valor é guardado em centavos inteiros; a conversão para R$ acontece só na exibição
+SQL_CRIAR_FATOS = """
+    CREATE TABLE IF NOT EXISTS fatos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        referencia_id INTEGER,
+        periodo INTEGER,
+        tipo_id INTEGER,
+        grupo_id INTEGER,
+        item_id INTEGER,
+        competencia TEXT,
+        liquidacao TEXT,
+        documento TEXT,
+        forma_pgto_id INTEGER,
+        valor INTEGER
+    )
+"""
+
+SQL_CRIAR_DIMENSOES = tuple(
+    f"CREATE TABLE IF NOT EXISTS dim_{dimensao} (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE)"
+    for dimensao in DIMENSOES
+)
+
+# Mesmas colunas, na mesma ordem, da antiga tabela dados
+SQL_CRIAR_VIEW_DADOS = """
+    CREATE VIEW IF NOT EXISTS dados AS
+    SELECT f.id, r.nome AS referencia, t.nome AS tipo, g.nome AS grupo, i.nome AS item,
+           f.competencia, f.liquidacao, f.documento, fp.nome AS forma_pgto, f.valor, f.periodo
+    FROM fatos f
+    LEFT JOIN dim_referencia r ON r.id = f.referencia_id
+    LEFT JOIN dim_tipo t ON t.id = f.tipo_id
+    LEFT JOIN dim_grupo g ON g.id = f.grupo_id
+    LEFT JOIN dim_item i ON i.id = f.item_id
+    LEFT JOIN dim_forma_pgto fp ON fp.id = f.forma_pgto_id
+"""
+
+# Tabela temporária (da conexão) que recebe as linhas com os nomes antes de virarem chaves;
+# a afinidade TEXT converte os valores exatamente como a antiga tabela dados fazia
+SQL_CRIAR_CARGA = """
+    CREATE TEMP TABLE IF NOT EXISTS carga (
+        id INTEGER,
+        referencia TEXT,
+        periodo INTEGER,
+        tipo TEXT,
+        grupo TEXT,
+        item TEXT,
+        competencia TEXT,
+        liquidacao TEXT,
+        documento TEXT,
+        forma_pgto TEXT,
+        valor INTEGER
+    )
+"""
+
+# Tabela dados do formato anterior às dimensões; usada só para migrar bancos antigos
+SQL_CRIAR_DADOS_LEGADO = """
+    CREATE TABLE IF NOT EXISTS dados (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        referencia TEXT,
+        tipo TEXT,
+        grupo TEXT,
+        item TEXT,
+        competencia TEXT,
+        liquidacao TEXT,
+        documento TEXT,
+        forma_pgto TEXT,
+        valor INTEGER,
+        periodo INTEGER
+    )
+"""
+
+# periodo (aaaamm) é a chave de ordenação e filtro dos períodos importados
+SQL_CRIAR_INDICES = (
+    "CREATE INDEX IF NOT EXISTS idx_fatos_referencia_periodo ON fatos (referencia_id, periodo)",
+    "CREATE INDEX IF NOT EXISTS idx_fatos_periodo_tipo_grupo ON fatos (periodo, tipo_id, grupo_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fatos_periodo_tipo_forma_pgto ON fatos (periodo, tipo_id, forma_pgto_id)",
+)
+
+# Totais de `dados` por período, tipo, grupo e forma de pagamento, atualizados na
+# mesma transação que grava ou exclui o período; valor em centavos
+SQL_CRIAR_RESUMO = """
+    CREATE TABLE IF NOT EXISTS resumo_mensal (
+        referencia TEXT,
+        periodo INTEGER,
+        tipo TEXT,
+        grupo TEXT,
+        forma_pgto TEXT,
+        valor INTEGER,
+        registros INTEGER
+    )
+"""
+
+SQL_CRIAR_INDICE_RESUMO = "CREATE INDEX IF NOT EXISTS idx_resumo_mensal_referencia ON resumo_mensal (referencia)"
+
+# Agrupa pelas chaves inteiras e só então busca os nomes
+SQL_RESUMIR_REFERENCIA = """
+    INSERT INTO resumo_mensal (referencia, periodo, tipo, grupo, forma_pgto, valor, registros)
+    SELECT r.nome, f.periodo, t.nome, g.nome, fp.nome, COALESCE(SUM(f.valor), 0), COUNT(*)
+    FROM fatos f
+    JOIN dim_referencia r ON r.id = f.referencia_id
+    LEFT JOIN dim_tipo t ON t.id = f.tipo_id
+    LEFT JOIN dim_grupo g ON g.id = f.grupo_id
+    LEFT JOIN dim_forma_pgto fp ON fp.id = f.forma_pgto_id
+    WHERE r.nome = ?
+    GROUP BY f.periodo, f.tipo_id, f.grupo_id, f.forma_pgto_id
+"""
+
+# Leituras do resumo_mensal, compartilhadas pelas funções abaixo e pela linha de comando
+SQL_RESUMO_POR_REFERENCIA = "SELECT tipo, grupo, forma_pgto, valor, registros FROM resumo_mensal WHERE referencia = ?"
+
+# Uma linha por período, do mais recente ao mais antigo; {filtro} recebe um WHERE opcional
+SQL_TOTAIS_POR_PERIODO = """
+    SELECT referencia,
+           MAX(periodo) AS periodo,
+           SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE 0 END) AS receitas,
+           SUM(CASE WHEN tipo = 'Despesa' THEN valor ELSE 0 END) AS despesas,
+           SUM(registros) AS registros
+    FROM resumo_mensal
+    {filtro}
+    GROUP BY referencia
+    ORDER BY MAX(periodo) DESC, referencia DESC
+"""
+
+# Contador de geração dos dados: toda gravação ou exclusão o incrementa na mesma
+# transação, invalidando o cache de consultas de todas as sessões e processos
+SQL_CRIAR_CONTROLE = """
+    CREATE TABLE IF NOT EXISTS controle (
+        chave TEXT PRIMARY KEY,
+        valor INTEGER
+    )
+"""
+
+SQL_INSERIR_DADOS = """
+    INSERT INTO carga (referencia, periodo, tipo, grupo, item, competencia, liquidacao, documento, forma_pgto, valor)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _sql_fatos_de(origem):
+    """INSERT das linhas de `origem` (carga ou a tabela dados antiga) em fatos, trocando nomes por chaves"""
+    return f"""
+        INSERT INTO fatos (id, referencia_id, periodo, tipo_id, grupo_id, item_id,
+                           competencia, liquidacao, documento, forma_pgto_id, valor)
+        SELECT o.id, r.id, o.periodo, t.id, g.id, i.id, o.competencia, o.liquidacao, o.documento, fp.id, o.valor
+        FROM {origem} o
+        LEFT JOIN dim_referencia r ON r.nome = o.referencia
+        LEFT JOIN dim_tipo t ON t.nome = o.tipo
+        LEFT JOIN dim_grupo g ON g.nome = o.grupo
+        LEFT JOIN dim_item i ON i.nome = o.item
+        LEFT JOIN dim_forma_pgto fp ON fp.nome = o.forma_pgto
+        ORDER BY o.rowid
+    """
+
+
+def _transferir(conn, origem):
+    """Cadastra nas dimensões os nomes novos de `origem`, na ordem em que aparecem, e copia as linhas para fatos"""
+    for dimensao in DIMENSOES:
+        conn.execute(f"""
+            INSERT OR IGNORE INTO dim_{dimensao} (nome)
+            SELECT {dimensao} FROM {origem} WHERE {dimensao} IS NOT NULL GROUP BY {dimensao} ORDER BY MIN(rowid)
+        """)
+    conn.execute(_sql_fatos_de(origem))
+
+# Colunas do DataFrame processado, na ordem de SQL_INSERIR_DADOS após referência e periodo
+COLUNAS_PLANILHA = ['Tipo', 'Grupo', 'Item', 'Competência', 'Liquidação', 'Documento', 'Forma de Pgto.', 'Valor']
+
+
+class Armazenamento:
+    """
+    Conexão SQLite única para um arquivo de banco, compartilhada pelas threads
+    do processo (as execuções do script no Streamlit) e protegida por um lock.
+    WAL e os demais pragmas são aplicados uma vez, na abertura. Cada consulta
+    ou transação tem o tempo registrado em `tempos`, para diagnóstico, e
+    conta como etapa 'banco: <rótulo>' da medição ativa (ver diagnostico).
+
+    Os resultados das consultas ficam num cache LRU chaveado por (sql, params)
+    e valem enquanto o contador de geração gravado no banco não mudar.
+
+    `diretorio_colunar`, quando definido por init_db, é o arquivo Parquet
+    atualizado após cada gravação ou exclusão (ver conselho_fiscal.colunar).
+    """
+
+    def __init__(self, db_path=DB_PATH, max_tempos=500, capacidade_cache=128):
+        self.db_path = db_path
+        self.tempos = deque(maxlen=max_tempos)
+        self.capacidade_cache = capacidade_cache
+        self.acertos = 0
+        self.falhas = 0
+        self.diretorio_colunar = None
+        self._cache = OrderedDict()
+        self._geracao_cache = None
+        self._lock = threading.RLock()
+        # Autocommit: as transações são abertas e fechadas explicitamente em transacao()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(SQL_CRIAR_CONTROLE)
+        self._conn.execute("INSERT OR IGNORE INTO controle (chave, valor) VALUES ('geracao', 0)")
+
+    @contextmanager
+    def _medir(self, rotulo):
+        diagnostico.contar('consultas ao banco')
+        inicio = time.perf_counter()
+        try:
+            with diagnostico.etapa(f'banco: {rotulo}') as registro:
+                yield registro
+        finally:
+            self.tempos.append((rotulo, time.perf_counter() - inicio))
+
+    def geracao(self):
+        """Valor atual do contador de geração dos dados"""
+        with self._lock:
+            return self._conn.execute("SELECT valor FROM controle WHERE chave = 'geracao'").fetchone()[0]
+
+    def consultar(self, sql, params=(), rotulo='consulta'):
+        """
+        Resultado de uma consulta de leitura como DataFrame (sempre uma cópia).
+        Repete o resultado guardado enquanto a geração dos dados não mudar.
+        """
+        chave = (sql, tuple(params))
+        with self._lock:
+            geracao = self.geracao()
+            if geracao != self._geracao_cache:
+                self._cache.clear()
+                self._geracao_cache = geracao
+            df = self._cache.get(chave)
+            if df is not None:
+                self._cache.move_to_end(chave)
+                self.acertos += 1
+                diagnostico.contar('cache de consultas: acertos')
+                return df.copy()
+            self.falhas += 1
+            diagnostico.contar('cache de consultas: falhas')
+            # carregado só aqui: quem não lê DataFrames (a linha de comando) inicia sem pandas
+            import pandas as pd
+
+            with self._medir(rotulo) as registro:
+                df = pd.read_sql_query(sql, self._conn, params=params)
+                registro.linhas = len(df)
+            self._cache[chave] = df
+            while len(self._cache) > self.capacidade_cache:
+                self._cache.popitem(last=False)
+            return df.copy()
+
+    @contextmanager
+    def transacao(self, rotulo='transação'):
+        """Entrega a conexão dentro de BEGIN/COMMIT; qualquer exceção desfaz tudo"""
+        with self._lock, self._medir(rotulo):
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @contextmanager
+    def leitura_isolada(self, rotulo='leitura'):
+        """
+        Conexão própria e só de leitura, aberta numa transação: todas as
+        consultas feitas nela veem o mesmo retrato do banco (WAL), sem segurar
+        o lock da conexão compartilhada. Para leituras longas, como o
+        relatório, que não devem bloquear as demais sessões.
+        """
+        uri = pathlib.Path(os.path.abspath(self.db_path)).as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout=5000")
+            with self._medir(rotulo):
+                conn.execute("BEGIN")
+                yield conn
+        finally:
+            conn.close()
+
+    def executar_script(self, script, rotulo='script'):
+        """Executa um script SQL que controla a própria transação (BEGIN/COMMIT)"""
+        with self._lock, self._medir(rotulo):
+            self._conn.executescript(script)
+
+    def estatisticas(self):
+        """Chamadas e tempos (ms) por rótulo, das mais custosas às mais baratas"""
+        import pandas as pd
+
+        tempos = pd.DataFrame(list(self.tempos), columns=['rotulo', 'segundos'])
+        resumo = tempos.groupby('rotulo')['segundos'].agg(['count', 'sum', 'mean', 'max'])
+        resumo.columns = ['chamadas', 'total_ms', 'medio_ms', 'max_ms']
+        resumo[['total_ms', 'medio_ms', 'max_ms']] *= 1000
+        return resumo.sort_values('total_ms', ascending=False).reset_index()
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+_armazenamentos = {}
+_armazenamentos_lock = threading.Lock()
+
+
+def obter_armazenamento(db_path=DB_PATH):
+    """
+    Armazenamento compartilhado de `db_path` no processo atual. A chave inclui
+    o pid para que processos filhos (fork) abram a própria conexão.
+    """
+    chave = (os.getpid(), os.path.abspath(db_path))
+    with _armazenamentos_lock:
+        if chave not in _armazenamentos:
+            _armazenamentos[chave] = Armazenamento(db_path)
+        return _armazenamentos[chave]
+
+
+def init_db(db_path=DB_PATH, diretorio_colunar=None):
+    armazenamento = obter_armazenamento(db_path)
+    with armazenamento.transacao('init_db') as conn:
+        objeto = conn.execute("SELECT type FROM sqlite_master WHERE name = 'dados'").fetchone()
+        legado = objeto is not None and objeto[0] == 'table'
+        tipos_colunas = {coluna[1]: coluna[2] for coluna in conn.execute("PRAGMA table_info(dados)")} if legado else {}
+    # Bancos antigos guardavam valor em reais (REAL): migra para centavos no lugar
+    if tipos_colunas.get('valor') == 'REAL':
+        armazenamento.executar_script(f"""
+            BEGIN;
+            ALTER TABLE dados RENAME TO dados_em_reais;
+            {SQL_CRIAR_DADOS_LEGADO};
+            INSERT INTO dados (id, referencia, tipo, grupo, item, competencia, liquidacao, documento, forma_pgto, valor)
+            SELECT id, referencia, tipo, grupo, item, competencia, liquidacao, documento, forma_pgto,
+                   CAST(ROUND(valor * 100) AS INTEGER)
+            FROM dados_em_reais;
+            DROP TABLE dados_em_reais;
+            UPDATE controle SET valor = valor + 1 WHERE chave = 'geracao';
+            COMMIT;
+        """, 'init_db')
+    with armazenamento.transacao('init_db') as conn:
+        conn.execute(SQL_CRIAR_FATOS)
+        for sql in SQL_CRIAR_DIMENSOES:
+            conn.execute(sql)
+        # Bancos anteriores às dimensões: a tabela dados vira fatos + dimensões, e
+        # `dados` passa a ser a view com os nomes; os ids são preservados
+        if legado:
+            if 'periodo' not in {coluna[1] for coluna in conn.execute("PRAGMA table_info(dados)")}:
+                conn.execute("ALTER TABLE dados ADD COLUMN periodo INTEGER")
+            _transferir(conn, 'dados')
+            conn.execute("DROP TABLE dados")
+        conn.execute(SQL_CRIAR_VIEW_DADOS)
+        # Linhas sem periodo (bancos anteriores à chave ou referências antes não
+        # reconhecidas): preenche a partir da referência
+        sem_periodo = [linha[0] for linha in conn.execute("""
+            SELECT DISTINCT r.nome FROM fatos f JOIN dim_referencia r ON r.id = f.referencia_id WHERE f.periodo IS NULL
+        """)]
+        a_preencher = [ref for ref in sem_periodo if periodo_da_referencia(ref)]
+        conn.executemany("""
+            UPDATE fatos SET periodo = ?
+            WHERE referencia_id = (SELECT id FROM dim_referencia WHERE nome = ?) AND periodo IS NULL
+        """, [(periodo_da_referencia(ref), ref) for ref in a_preencher])
+        for sql in SQL_CRIAR_INDICES:
+            conn.execute(sql)
+        # Bancos anteriores ao resumo_mensal resumem todos os períodos; os demais,
+        # só os que acabaram de receber o periodo
+        resumo_existia = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumo_mensal'").fetchone()
+        conn.execute(SQL_CRIAR_RESUMO)
+        conn.execute(SQL_CRIAR_INDICE_RESUMO)
+        if not resumo_existia:
+            a_preencher = [linha[0] for linha in conn.execute("SELECT DISTINCT referencia FROM dados")]
+        for referencia in a_preencher:
+            _atualizar_resumo(conn, referencia)
+        if a_preencher or legado:
+            _incrementar_geracao(conn)
+    # Espelho colunar opcional (requer pyarrow): alinhado com o banco na abertura
+    # só se o banco mudou desde a última sincronização (o app chama init_db a
+    # cada rerun; gravações de outros processos, como a linha de comando sem
+    # --colunar, aparecem aqui)
+    if diretorio_colunar:
+        from conselho_fiscal import colunar  # importado aqui: colunar depende deste módulo
+        if colunar.DISPONIVEL:
+            armazenamento.diretorio_colunar = diretorio_colunar
+            _espelhar(armazenamento)
+
+
+def _espelhar(armazenamento, referencias=None):
+    """
+    Leva ao arquivo colunar, se ativo, o estado atual das `referencias` e grava
+    em controle a geração do banco que ele passa a refletir. Sem referências,
+    ou se o banco mudou além da gravação de quem chama (outro processo gravou
+    sem atualizar o espelho), sincroniza todas as que divergem.
+    """
+    if not armazenamento.diretorio_colunar:
+        return
+    from conselho_fiscal import colunar
+
+    diretorio = armazenamento.diretorio_colunar
+    chave = f"colunar:{os.path.abspath(diretorio)}"
+    with armazenamento.transacao('geracao_colunar') as conn:
+        geracao = conn.execute("SELECT valor FROM controle WHERE chave = 'geracao'").fetchone()[0]
+        linha = conn.execute("SELECT valor FROM controle WHERE chave = ?", (chave,)).fetchone()
+    sincronizada = None if linha is None else linha[0]
+    if referencias is None and sincronizada == geracao and os.path.isdir(diretorio):
+        return
+    # Cada gravação avança a geração em 1: qualquer diferença maior é de outro processo
+    if sincronizada is None or geracao - sincronizada > 1:
+        referencias = None
+    colunar.sincronizar(diretorio, armazenamento.db_path, referencias)
+    with armazenamento.transacao('geracao_colunar') as conn:
+        conn.execute("INSERT OR REPLACE INTO controle (chave, valor) VALUES (?, ?)", (chave, geracao))
+
+
+def _incrementar_geracao(conn):
+    """Marca, dentro da transação de quem chama, que os dados mudaram"""
+    conn.execute("UPDATE controle SET valor = valor + 1 WHERE chave = 'geracao'")
+
+
+def _atualizar_resumo(conn, referencia):
+    """Refaz as linhas do resumo_mensal de um período, dentro da transação de quem chama"""
+    conn.execute("DELETE FROM resumo_mensal WHERE referencia = ?", (referencia,))
+    conn.execute(SQL_RESUMIR_REFERENCIA, (referencia,))
+
+
+def inserir_dados(df, referencia, db_path=DB_PATH):
+    """Grava um período numa única transação (ver inserir_varios)"""
+    inserir_varios({referencia: df}, db_path)
+
+
+def _linhas_dados(df, referencia):
+    """Tuplas prontas para SQL_INSERIR_DADOS, com None no lugar dos valores ausentes"""
+    colunas = [df[coluna].to_numpy(dtype=object, na_value=None) for coluna in COLUNAS_PLANILHA]
+    return list(zip(itertools.repeat(referencia, len(df)),
+                    itertools.repeat(periodo_da_referencia(referencia), len(df)),
+                    *colunas))
+
+
+def inserir_varios(dados_por_referencia, db_path=DB_PATH):
+    """
+    Grava vários períodos ({referencia: df}) numa única transação:
+    se qualquer inserção falhar, nenhum período é gravado.
+    """
+    linhas = {referencia: _linhas_dados(df, referencia) for referencia, df in dados_por_referencia.items()}
+    armazenamento = obter_armazenamento(db_path)
+    with armazenamento.transacao('inserir_dados') as conn:
+        conn.execute(SQL_CRIAR_CARGA)
+        with diagnostico.etapa('carga', linhas=sum(map(len, linhas.values()))):
+            for linhas_referencia in linhas.values():
+                conn.executemany(SQL_INSERIR_DADOS, linhas_referencia)
+        _transferir(conn, 'carga')
+        conn.execute("DELETE FROM carga")
+        for referencia in linhas:
+            _atualizar_resumo(conn, referencia)
+        _incrementar_geracao(conn)
+    _espelhar(armazenamento, list(linhas))
+
+
+def carregar_referencias(db_path=DB_PATH):
+    # Mais recentes primeiro; referências sem período reconhecível ficam no fim
+    refs = obter_armazenamento(db_path).consultar("""
+        SELECT r.nome AS referencia
+        FROM fatos f JOIN dim_referencia r ON r.id = f.referencia_id
+        GROUP BY f.referencia_id
+        ORDER BY MAX(f.periodo) DESC, r.nome DESC
+    """, rotulo='carregar_referencias')
+    return refs['referencia'].tolist()
+
+
+def _categorias(armazenamento, dimensao, chaves, referencia):
+    """
+    Categorical com os nomes de dim_<dimensao> a partir das chaves inteiras
+    (nulas viram NaN). As categorias são só as usadas pelo período: a memória
+    de um mês lido não cresce com o histórico.
+    """
+    import pandas as pd
+
+    nomes = armazenamento.consultar(f"""
+        SELECT id, nome FROM dim_{dimensao}
+        WHERE id IN (
+            SELECT {dimensao}_id FROM fatos
+            WHERE referencia_id = (SELECT id FROM dim_referencia WHERE nome = ?)
+        )
+        ORDER BY id
+    """, (referencia,), rotulo='carregar_dimensoes')
+    posicoes = pd.Series(range(len(nomes)), index=nomes['id'])
+    codigos = chaves.map(posicoes).fillna(-1).astype(int)
+    return pd.Categorical.from_codes(codigos, categories=nomes['nome'])
+
+
+def carregar_dados_por_referencia(referencia, db_path=DB_PATH):
+    """
+    Linhas de um período com as colunas de `dados`; referencia, tipo, grupo
+    e forma_pgto chegam como Categorical, montadas das chaves inteiras, e
+    item como texto.
+    """
+    armazenamento = obter_armazenamento(db_path)
+    df = armazenamento.consultar("""
+        SELECT f.id, f.referencia_id AS referencia, f.tipo_id AS tipo, f.grupo_id AS grupo, i.nome AS item,
+               f.competencia, f.liquidacao, f.documento, f.forma_pgto_id AS forma_pgto, f.valor, f.periodo
+        FROM fatos f
+        LEFT JOIN dim_item i ON i.id = f.item_id
+        WHERE f.referencia_id = (SELECT id FROM dim_referencia WHERE nome = ?)
+        ORDER BY f.id
+    """, (referencia,), rotulo='carregar_dados_por_referencia')
+    for dimensao in DIMENSOES_CATEGORICAS:
+        df[dimensao] = _categorias(armazenamento, dimensao, df[dimensao], referencia)
+    df['valor'] = df['valor'].astype('Int64')
+    return df
+
+
+def excluir_referencia(referencia, db_path=DB_PATH):
+    armazenamento = obter_armazenamento(db_path)
+    with armazenamento.transacao('excluir_referencia') as conn:
+        conn.execute("DELETE FROM fatos WHERE referencia_id = (SELECT id FROM dim_referencia WHERE nome = ?)", (referencia,))
+        conn.execute("DELETE FROM resumo_mensal WHERE referencia = ?", (referencia,))
+        _incrementar_geracao(conn)
+    _espelhar(armazenamento, [referencia])
+
+
+def excluir_todos(db_path=DB_PATH):
+    armazenamento = obter_armazenamento(db_path)
+    with armazenamento.transacao('excluir_todos') as conn:
+        conn.execute("DELETE FROM fatos")
+        conn.execute("DELETE FROM resumo_mensal")
+        _incrementar_geracao(conn)
+    _espelhar(armazenamento)
+
+
+def carregar_resumo_por_referencia(referencia, db_path=DB_PATH):
+    """Totais do período por tipo, grupo e forma de pagamento (valor em centavos)"""
+    df = obter_armazenamento(db_path).consultar(
+        SQL_RESUMO_POR_REFERENCIA, (referencia,), rotulo='carregar_resumo_por_referencia'
+    )
+    df['valor'] = df['valor'].astype('Int64')
+    return df
+
+
+def verificar_resumo(db_path=DB_PATH):
+    """
+    Compara o resumo_mensal com os totais recalculados a partir de `dados`.
+    Devolve as linhas divergentes, com a coluna 'origem' indicando em qual
+    lado cada uma aparece; um DataFrame vazio significa resumo consistente.
+    """
+    return obter_armazenamento(db_path).consultar("""
+        WITH recalculado AS (
+            SELECT referencia, periodo, tipo, grupo, forma_pgto, COALESCE(SUM(valor), 0) AS valor, COUNT(*) AS registros
+            FROM dados
+            GROUP BY referencia, periodo, tipo, grupo, forma_pgto
+        ),
+        gravado AS (
+            SELECT referencia, periodo, tipo, grupo, forma_pgto, valor, registros FROM resumo_mensal
+        )
+        SELECT 'dados' AS origem, * FROM (SELECT * FROM recalculado EXCEPT SELECT * FROM gravado)
+        UNION ALL
+        SELECT 'resumo_mensal' AS origem, * FROM (SELECT * FROM gravado EXCEPT SELECT * FROM recalculado)
+        ORDER BY referencia, tipo, grupo, forma_pgto, origem
+    """, rotulo='verificar_resumo')
+
+
+def reconstruir_resumo(db_path=DB_PATH):
+    """Refaz o resumo_mensal inteiro a partir de `dados`, numa única transação"""
+    with obter_armazenamento(db_path).transacao('reconstruir_resumo') as conn:
+        conn.execute("DELETE FROM resumo_mensal")
+        for (referencia,) in conn.execute("SELECT DISTINCT referencia FROM dados").fetchall():
+            _atualizar_resumo(conn, referencia)
+        _incrementar_geracao(conn)
+
+
+def carregar_historico(db_path=DB_PATH):
+    """
+    Resumo de todos os períodos numa única consulta, separado em memória:
+    {referencia: DataFrame como o de carregar_resumo_por_referencia}, do
+    período mais recente ao mais antigo.
+    """
+    df = obter_armazenamento(db_path).consultar("""
+        SELECT referencia, tipo, grupo, forma_pgto, valor, registros
+        FROM resumo_mensal
+        ORDER BY periodo DESC, referencia DESC
+    """, rotulo='carregar_historico')
+    df['valor'] = df['valor'].astype('Int64')
+    return {
+        referencia: resumo.drop(columns='referencia').reset_index(drop=True)
+        for referencia, resumo in df.groupby('referencia', sort=False, observed=True)
+    }
+
+
+def carregar_totais_por_periodo(db_path=DB_PATH):
+    """
+    Uma linha por período, do mais recente ao mais antigo, com o periodo
+    (aaaamm), receitas, despesas, saldo (em centavos) e número de registros,
+    lida do resumo_mensal.
+    """
+    df = obter_armazenamento(db_path).consultar(
+        SQL_TOTAIS_POR_PERIODO.format(filtro=''), rotulo='carregar_totais_por_periodo'
+    )
+    df[['receitas', 'despesas']] = df[['receitas', 'despesas']].astype('Int64')
+    df['saldo'] = df['receitas'] - df['despesas']
+    return df
@@ -0,0 +1,104 @@
+"""Cache das planilhas já processadas, indexado pelo conteúdo do arquivo."""
+
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from conselho_fiscal import diagnostico
+from conselho_fiscal.ingestao import VERSAO_FORMATO
+
+
+def hash_conteudo(conteudo):
+    """SHA-256 (hexadecimal) dos bytes do arquivo enviado."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+class CacheLeituras:
+    """
+    LRU em memória dos DataFrames processados, indexado pelo SHA-256 dos
+    bytes do arquivo, com persistência opcional em Parquet em `diretorio`
+    (requer pyarrow; sem ele o cache fica só em memória).
+
+    A chave inclui `versao` (por padrão ingestao.VERSAO_FORMATO): arquivos
+    gravados por outra versão do parser são ignorados, não reaproveitados.
+
+    Uma mesma instância pode ser compartilhada entre as sessões do Streamlit.
+    """
+
+    def __init__(self, capacidade=8, diretorio=None, versao=VERSAO_FORMATO):
+        self.capacidade = capacidade
+        self.versao = versao
+        self.diretorio = diretorio if importlib.util.find_spec('pyarrow') else None
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f'{chave}.parquet')
+
+    def _ler_do_disco(self, chave):
+        if not (self.diretorio and os.path.exists(self._caminho(chave))):
+            return None
+        import pyarrow.parquet as pq  # carregado só aqui: pyarrow é opcional
+
+        df = pd.read_parquet(self._caminho(chave))
+        # Colunas object só com texto voltam como str: os metadados do pandas no
+        # arquivo guardam o dtype original, e os ausentes voltam a ser None (como
+        # vêm da planilha), para que a leitura do disco seja igual à da planilha
+        originais = {coluna['name']: coluna['numpy_type'] for coluna in pq.read_schema(self._caminho(chave)).pandas_metadata['columns']}
+        for coluna in df.columns:
+            if originais.get(coluna) == 'object' and df[coluna].dtype != object:
+                df[coluna] = df[coluna].astype(object).where(df[coluna].notna(), None)
+        return df
+
+    def _gravar_no_disco(self, chave, df):
+        if not self.diretorio:
+            return
+        try:
+            df.to_parquet(self._caminho(chave), index=False)
+        except (TypeError, ValueError):
+            # Colunas com tipos misturados não cabem em Parquet; fica só em memória
+            pass
+
+    def _guardar(self, chave, df):
+        self._itens[chave] = df
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def obter(self, conteudo, processar):
+        """
+        Devolve uma cópia do DataFrame já processado para `conteudo` (bytes) ou,
+        na primeira vez, o resultado de `processar()`. Resultados None e exceções
+        levantadas por `processar()` (arquivo inválido) não são guardados.
+        """
+        chave = f'v{self.versao}-{hash_conteudo(conteudo)}'
+        with self._lock:
+            df = self._itens.get(chave)
+            if df is None:
+                df = self._ler_do_disco(chave)
+                if df is not None:
+                    self._guardar(chave, df)
+            else:
+                self._itens.move_to_end(chave)
+            if df is not None:
+                self.acertos += 1
+                diagnostico.contar('cache de leituras: acertos')
+                return df.copy()
+            self.falhas += 1
+            diagnostico.contar('cache de leituras: falhas')
+
+        df = processar()
+        if df is not None:
+            with self._lock:
+                self._guardar(chave, df)
+            self._gravar_no_disco(chave, df)
+            df = df.copy()
+        return df
@@ -0,0 +1,160 @@
+"""
+Linha de comando para tarefas agendadas e scripts, sem a interface Streamlit:
+
+    python -m conselho_fiscal importar planilha.xlsx [...] [--referencia REF]
+    python -m conselho_fiscal resumo [--referencia REF | --de AAAAMM --ate AAAAMM] [--formato csv]
+    python -m conselho_fiscal exportar --de AAAAMM [--ate AAAAMM] -o relatorio.xlsx
+
+Cada comando importa só o que usa: resumo lê o banco apenas com sqlite3, sem
+pandas, para poder ser chamado milhares de vezes; importar carrega a leitura
+das planilhas (pandas) e exportar, o xlsxwriter. Valores saem em centavos.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from conselho_fiscal.banco import (
+    DB_PATH,
+    SQL_RESUMO_POR_REFERENCIA,
+    SQL_TOTAIS_POR_PERIODO,
+    init_db,
+    obter_armazenamento,
+)
+from conselho_fiscal.referencias import periodo_da_referencia
+
+FORMATOS = ('json', 'csv')
+
+
+def _periodo(texto):
+    """aaaamm a partir de '202501' ou de uma referência como 'jan/2025' ou '01/2025'"""
+    if texto.isdigit() and len(texto) == 6:
+        return int(texto)
+    periodo = periodo_da_referencia(texto)
+    if periodo is None:
+        raise argparse.ArgumentTypeError(f"período não reconhecido: {texto!r} (use aaaamm ou uma referência como jan/2025)")
+    return periodo
+
+
+def _escrever(linhas, colunas, formato, saida=None):
+    """Lista de dicionários como um array JSON ou um CSV com cabeçalho"""
+    saida = saida or sys.stdout
+    if formato == 'json':
+        json.dump(linhas, saida, ensure_ascii=False, indent=2)
+        saida.write('\n')
+    else:
+        escritor = csv.DictWriter(saida, fieldnames=colunas, lineterminator='\n')
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+
+def importar(args):
+    """Importa as planilhas numa única transação; sai com 1 se alguma ficou de fora."""
+    from conselho_fiscal.lote import importar_lote, processar_lote  # carrega pandas
+
+    init_db(args.db, diretorio_colunar=args.colunar)
+    resultados = processar_lote([(os.path.basename(caminho), caminho) for caminho in args.arquivos], args.processos)
+    if args.referencia:
+        for resultado in resultados:
+            if not resultado.erro:
+                resultado.referencia = args.referencia
+    importar_lote(resultados, args.db)
+
+    colunas = ['arquivo', 'referencia', 'linhas', 'valores_invalidos', 'segundos', 'importado', 'erro']
+    _escrever([
+        {
+            'arquivo': resultado.nome,
+            'referencia': resultado.referencia,
+            'linhas': None if resultado.dados is None else len(resultado.dados),
+            'valores_invalidos': None if resultado.dados is None else resultado.dados.attrs.get('valores_invalidos', 0),
+            'segundos': round(resultado.segundos, 3),
+            'importado': resultado.importado,
+            'erro': resultado.erro,
+        }
+        for resultado in resultados
+    ], colunas, args.formato)
+    return 0 if all(resultado.importado for resultado in resultados) else 1
+
+
+def resumo(args):
+    """
+    Totais por período (receitas, despesas, saldo e registros) ou, com
+    --referencia, as linhas do resumo_mensal daquele período.
+    """
+    init_db(args.db)
+    with obter_armazenamento(args.db).transacao('cli_resumo') as conn:
+        if args.referencia:
+            colunas = ['tipo', 'grupo', 'forma_pgto', 'valor', 'registros']
+            cursor = conn.execute(SQL_RESUMO_POR_REFERENCIA, (args.referencia,))
+        else:
+            colunas = ['referencia', 'periodo', 'receitas', 'despesas', 'saldo', 'registros']
+            condicoes, params = [], []
+            if args.de is not None:
+                condicoes.append("periodo >= ?")
+                params.append(args.de)
+            if args.ate is not None:
+                condicoes.append("periodo <= ?")
+                params.append(args.ate)
+            filtro = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+            cursor = conn.execute(SQL_TOTAIS_POR_PERIODO.format(filtro=filtro), params)
+        nomes = [descricao[0] for descricao in cursor.description]
+        linhas = [dict(zip(nomes, linha)) for linha in cursor]
+    if not args.referencia:
+        for linha in linhas:
+            linha['saldo'] = linha['receitas'] - linha['despesas']
+    _escrever([{coluna: linha[coluna] for coluna in colunas} for linha in linhas], colunas, args.formato)
+    if args.referencia and not linhas:
+        print(f"Referência {args.referencia!r} não encontrada no banco", file=sys.stderr)
+        return 1
+    return 0
+
+
+def exportar(args):
+    """Grava o relatório consolidado do intervalo de períodos em Excel."""
+    from conselho_fiscal.exportacao import gerar_relatorio
+
+    init_db(args.db)
+    periodo_final = args.de if args.ate is None else args.ate
+    periodo_inicial, periodo_final = sorted((args.de, periodo_final))
+    gerar_relatorio(periodo_inicial, periodo_final, destino=args.saida, com_dados=not args.sem_dados, db_path=args.db)
+    print(args.saida)
+    return 0
+
+
+def main(argv=None):
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument('--db', default=DB_PATH, help=f"banco SQLite (padrão: {DB_PATH})")
+
+    parser = argparse.ArgumentParser(prog='python -m conselho_fiscal', description=__doc__.strip().splitlines()[0].rstrip(':') + '.')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_importar = comandos.add_parser('importar', parents=[comum], help="importa uma ou mais planilhas para o banco")
+    p_importar.add_argument('arquivos', nargs='+', help="planilhas .xlsx a importar")
+    p_importar.add_argument('--referencia', help="referência a usar no lugar da detectada (só com um arquivo)")
+    p_importar.add_argument('--processos', type=int, default=None, help="número de processos (padrão: um por núcleo)")
+    p_importar.add_argument('--colunar', default=None, help="diretório do espelho Parquet a manter atualizado (requer pyarrow)")
+    p_importar.add_argument('--formato', choices=FORMATOS, default='json')
+    p_importar.set_defaults(executar=importar)
+
+    p_resumo = comandos.add_parser('resumo', parents=[comum], help="imprime os totais dos períodos importados")
+    p_resumo.add_argument('--referencia', help="detalha um período (tipo, grupo e forma de pagamento)")
+    p_resumo.add_argument('--de', type=_periodo, help="primeiro período (aaaamm ou referência)")
+    p_resumo.add_argument('--ate', type=_periodo, help="último período (aaaamm ou referência)")
+    p_resumo.add_argument('--formato', choices=FORMATOS, default='json')
+    p_resumo.set_defaults(executar=resumo)
+
+    p_exportar = comandos.add_parser('exportar', parents=[comum], help="gera o relatório consolidado em Excel")
+    p_exportar.add_argument('--de', type=_periodo, required=True, help="primeiro período (aaaamm ou referência)")
+    p_exportar.add_argument('--ate', type=_periodo, help="último período (padrão: o mesmo de --de)")
+    p_exportar.add_argument('-o', '--saida', required=True, help="arquivo .xlsx de destino")
+    p_exportar.add_argument('--sem-dados', action='store_true', help="omite a planilha com todos os lançamentos")
+    p_exportar.set_defaults(executar=exportar)
+
+    args = parser.parse_args(argv)
+    if args.comando == 'importar' and args.referencia and len(args.arquivos) > 1:
+        parser.error("--referencia só pode ser usada com um único arquivo")
+    if args.comando == 'resumo' and args.referencia and (args.de or args.ate):
+        parser.error("--referencia não pode ser combinada com --de/--ate")
+    return args.executar(args)
@@ -0,0 +1,186 @@
+"""
+Arquivo colunar (Parquet) espelhando a tabela `dados`, particionado por período.
+
+Cada referência fica num arquivo próprio em `periodo=aaaamm/` (partição no
+estilo hive), com tipo, grupo e forma_pgto codificados em dicionário. O
+espelho é mantido pelo banco a cada importação ou exclusão quando ativado em
+init_db(diretorio_colunar=...), e serve também de backup: sincronizar() num
+diretório vazio grava o banco inteiro e restaurar() o traz de volta.
+
+Requer pyarrow (DISPONIVEL indica se está instalado).
+"""
+
+import importlib.util
+import os
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from conselho_fiscal.banco import (
+    DB_PATH,
+    SQL_CRIAR_CARGA,
+    _atualizar_resumo,
+    _espelhar,
+    _incrementar_geracao,
+    _transferir,
+    obter_armazenamento,
+)
+
+DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+
+# Partição das referências sem período reconhecível (lida de volta como nulo)
+PARTICAO_SEM_PERIODO = '__HIVE_DEFAULT_PARTITION__'
+
+COLUNAS_TEXTO = ['referencia', 'item', 'competencia', 'liquidacao', 'documento']
+COLUNAS_DICIONARIO = ['tipo', 'grupo', 'forma_pgto']
+COLUNAS_ARQUIVO = ['id', 'referencia', 'tipo', 'grupo', 'item', 'competencia', 'liquidacao', 'documento', 'forma_pgto', 'valor']
+
+# Como SQL_INSERIR_DADOS, mas preservando o id gravado no arquivo
+SQL_RESTAURAR_DADOS = """
+    INSERT INTO carga (id, referencia, periodo, tipo, grupo, item, competencia, liquidacao, documento, forma_pgto, valor)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _esquema():
+    """Esquema dos arquivos; periodo não é gravado, vem do nome da partição."""
+    import pyarrow as pa  # carregado só aqui: pyarrow é opcional
+
+    tipos = {coluna: pa.string() for coluna in COLUNAS_TEXTO}
+    tipos.update({coluna: pa.dictionary(pa.int32(), pa.string()) for coluna in COLUNAS_DICIONARIO})
+    tipos.update({'id': pa.int64(), 'valor': pa.int64()})
+    return pa.schema([(coluna, tipos[coluna]) for coluna in COLUNAS_ARQUIVO])
+
+
+def _caminho(diretorio, referencia, periodo):
+    particao = f"periodo={PARTICAO_SEM_PERIODO if periodo is None else int(periodo)}"
+    return os.path.join(diretorio, particao, f"{quote(referencia, safe='')}.parquet")
+
+
+def referencias_arquivadas(diretorio):
+    """{referencia: (periodo, linhas)} do que está gravado em `diretorio`, lido só dos metadados"""
+    import pyarrow.parquet as pq
+
+    arquivadas = {}
+    if not os.path.isdir(diretorio):
+        return arquivadas
+    for particao in os.listdir(diretorio):
+        if not particao.startswith('periodo='):
+            continue
+        valor = particao.split('=', 1)[1]
+        periodo = None if valor == PARTICAO_SEM_PERIODO else int(valor)
+        for nome in os.listdir(os.path.join(diretorio, particao)):
+            if nome.endswith('.parquet') and not nome.startswith('.'):
+                linhas = pq.read_metadata(os.path.join(diretorio, particao, nome)).num_rows
+                arquivadas[unquote(nome[:-len('.parquet')])] = (periodo, linhas)
+    return arquivadas
+
+
+def _gravar(diretorio, referencia, periodo, df):
+    """Grava um período de forma atômica (arquivo temporário + os.replace)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    caminho = _caminho(diretorio, referencia, periodo)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    tabela = pa.Table.from_pandas(df[COLUNAS_ARQUIVO], schema=_esquema(), preserve_index=False)
+    temporario = os.path.join(os.path.dirname(caminho), f".{os.path.basename(caminho)}.tmp")
+    pq.write_table(tabela, temporario, compression='zstd')
+    os.replace(temporario, caminho)
+
+
+def _remover(diretorio, referencia, periodo):
+    caminho = _caminho(diretorio, referencia, periodo)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    particao = os.path.dirname(caminho)
+    if os.path.isdir(particao) and not os.listdir(particao):
+        os.rmdir(particao)
+
+
+def sincronizar(diretorio, db_path=DB_PATH, referencias=None):
+    """
+    Deixa o arquivo igual ao banco para as `referencias` indicadas ou, sem
+    elas, para todas as que divergem em período ou número de linhas (incluindo
+    as que só existem de um dos lados). Devolve as referências regravadas ou
+    removidas.
+    """
+    armazenamento = obter_armazenamento(db_path)
+    arquivadas = referencias_arquivadas(diretorio)
+    with armazenamento.transacao('sincronizar_colunar') as conn:
+        no_banco = {
+            referencia: (periodo, linhas)
+            for referencia, periodo, linhas in conn.execute(
+                "SELECT referencia, MAX(periodo), COUNT(*) FROM dados GROUP BY referencia"
+            )
+        }
+        if referencias is None:
+            referencias = [ref for ref in set(no_banco) | set(arquivadas) if no_banco.get(ref) != arquivadas.get(ref)]
+        a_gravar = [ref for ref in referencias if ref in no_banco]
+        dados = pd.read_sql_query(
+            f"SELECT * FROM dados WHERE referencia IN ({', '.join('?' * len(a_gravar))}) ORDER BY id",
+            conn, params=a_gravar
+        ) if a_gravar else None
+
+    for referencia in referencias:
+        if referencia in arquivadas:
+            _remover(diretorio, referencia, arquivadas[referencia][0])
+    for referencia, df in (dados.groupby('referencia', sort=False, observed=True) if dados is not None else []):
+        _gravar(diretorio, referencia, no_banco[referencia][0], df)
+    return sorted(referencias)
+
+
+def ler_arquivo(diretorio, colunas=None, periodo_inicial=None, periodo_final=None):
+    """
+    Lê o arquivo como DataFrame, só com as `colunas` pedidas e, se informado,
+    só as partições do intervalo de períodos (aaaamm, inclusive). Os arquivos
+    são mapeados em memória; tipo, grupo e forma_pgto chegam como Categorical,
+    id e valor como Int64.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    esquema = _esquema().append(pa.field('periodo', pa.int32()))
+    dataset = ds.dataset(
+        diretorio if os.path.isdir(diretorio) else [],
+        schema=esquema,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([esquema.field('periodo')]), flavor='hive'),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    filtro = None
+    if periodo_inicial is not None:
+        filtro = ds.field('periodo') >= periodo_inicial
+    if periodo_final is not None:
+        limite = ds.field('periodo') <= periodo_final
+        filtro = limite if filtro is None else filtro & limite
+    tabela = dataset.to_table(columns=colunas, filter=filtro)
+    return tabela.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype(), pa.int32(): pd.Int64Dtype()}.get)
+
+
+def restaurar(diretorio, db_path=DB_PATH):
+    """
+    Substitui todo o conteúdo de `dados` (e do resumo_mensal) pelo arquivo,
+    numa única transação, preservando os ids. Devolve o número de linhas.
+    """
+    df = ler_arquivo(diretorio).sort_values('id', kind='stable')
+    linhas = list(zip(
+        df['id'].to_numpy(dtype=object, na_value=None),
+        df['referencia'].to_numpy(dtype=object, na_value=None),
+        df['periodo'].to_numpy(dtype=object, na_value=None),
+        *(df[coluna].to_numpy(dtype=object, na_value=None) for coluna in COLUNAS_ARQUIVO[2:]),
+    ))
+    armazenamento = obter_armazenamento(db_path)
+    with armazenamento.transacao('restaurar_colunar') as conn:
+        conn.execute("DELETE FROM fatos")
+        conn.execute("DELETE FROM resumo_mensal")
+        conn.execute(SQL_CRIAR_CARGA)
+        conn.executemany(SQL_RESTAURAR_DADOS, linhas)
+        _transferir(conn, 'carga')
+        conn.execute("DELETE FROM carga")
+        for referencia in df['referencia'].unique():
+            _atualizar_resumo(conn, referencia)
+        _incrementar_geracao(conn)
+    _espelhar(armazenamento)
+    return len(linhas)
@@ -0,0 +1,189 @@
+"""
+Consultas de resumo (totais por tipo, grupo e forma de pagamento, maiores
+valores) com motor intercambiável: pandas, o padrão, ou DuckDB (opcional).
+"""
+
+import importlib.util
+import os
+import threading
+
+import pandas as pd
+
+from conselho_fiscal.banco import COLUNAS_PLANILHA, obter_armazenamento
+
+MOTORES = ('pandas', 'duckdb')
+DUCKDB_DISPONIVEL = importlib.util.find_spec('duckdb') is not None
+
+# Colunas do DataFrame processado -> colunas de `dados`, para aceitar os dois formatos
+COLUNAS_DADOS = dict(zip(COLUNAS_PLANILHA, ['tipo', 'grupo', 'item', 'competencia', 'liquidacao', 'documento', 'forma_pgto', 'valor']))
+
+# Colunas pelas quais se pode agrupar (também protege o SQL montado com elas)
+DIMENSOES = ('tipo', 'grupo', 'forma_pgto', 'item')
+
+# Tabelas da aba de importação: (dimensão, tipo) -> totais por dimensão daquele tipo
+VISOES_RESUMO = (
+    ('grupo', 'Receita'),
+    ('grupo', 'Despesa'),
+    ('forma_pgto', 'Receita'),
+    ('forma_pgto', 'Despesa'),
+    ('tipo', None),
+)
+
+
+def _validar_dimensao(dimensao):
+    if dimensao not in DIMENSOES:
+        raise ValueError(f"Dimensão inválida: {dimensao!r} (use uma de {', '.join(DIMENSOES)})")
+
+
+def _padronizar(resumo, *dimensoes):
+    """Mesmo formato de saída nos dois motores: valor Int64, rótulos object com None"""
+    resumo['valor'] = resumo['valor'].astype('Int64')
+    for dimensao in dimensoes:
+        resumo[dimensao] = resumo[dimensao].astype(object).where(resumo[dimensao].notna(), None)
+    return resumo
+
+
+def _ordenar(resumo, dimensao):
+    """Do maior para o menor valor, empates pelo nome e rótulos vazios por último"""
+    return resumo.sort_values(
+        ['valor', dimensao], ascending=[False, True], na_position='last', kind='stable'
+    ).reset_index(drop=True)
+
+
+def _como_arrow(df):
+    """
+    Tabela Arrow do DataFrame, que o DuckDB lê sem converter as colunas de
+    texto; sem pyarrow, ou com colunas de tipos misturados, fica o próprio df.
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        return df
+    import pyarrow as pa
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (TypeError, ValueError):
+        return df
+
+
+class ConsultasPandas:
+    """Resumos calculados com groupby do pandas sobre um DataFrame em memória."""
+
+    motor = 'pandas'
+
+    def __init__(self, df):
+        self.df = df.rename(columns=COLUNAS_DADOS)
+
+    def totais(self, dimensao, tipo=None, limite=None):
+        """
+        Valor somado (centavos, Int64) por `dimensao`, do maior para o menor
+        (empates pelo nome). `tipo` filtra Receita ou Despesa antes de somar e
+        `limite` mantém só os N maiores.
+        """
+        _validar_dimensao(dimensao)
+        df = self.df if tipo is None else self.df[self.df['tipo'] == tipo]
+        resumo = _ordenar(df.groupby(dimensao, dropna=False, observed=True)['valor'].sum().reset_index(), dimensao)
+        resumo = _padronizar(resumo, dimensao)
+        return resumo if limite is None else resumo.head(limite)
+
+    def agrupar(self, dimensoes):
+        """Valor somado por combinação das `dimensoes`, sem ordem definida."""
+        for dimensao in dimensoes:
+            _validar_dimensao(dimensao)
+        resumo = self.df.groupby(list(dimensoes), dropna=False, observed=True)['valor'].sum().reset_index()
+        return _padronizar(resumo, *dimensoes)
+
+
+class ConsultasDuckDB:
+    """
+    Os mesmos resumos executados pelo DuckDB embutido. `origem` pode ser um
+    DataFrame, o diretório do espelho Parquet (conselho_fiscal.colunar) ou o
+    arquivo SQLite, lido direto (requer a extensão sqlite do DuckDB).
+    """
+
+    motor = 'duckdb'
+
+    def __init__(self, origem):
+        import duckdb  # carregado só aqui: duckdb é opcional
+
+        self._lock = threading.Lock()
+        self._conn = duckdb.connect()
+        if isinstance(origem, pd.DataFrame):
+            self._conn.register('dados', _como_arrow(origem.rename(columns=COLUNAS_DADOS)))
+        elif os.path.isdir(origem):
+            padrao = os.path.join(origem, '*', '*.parquet').replace("'", "''")
+            self._conn.execute(f"CREATE VIEW dados AS SELECT * FROM read_parquet('{padrao}', hive_partitioning = true)")
+        else:
+            self._conn.execute("INSTALL sqlite")
+            self._conn.execute("LOAD sqlite")
+            self._conn.execute(f"ATTACH '{origem.replace(chr(39), chr(39) * 2)}' AS banco (TYPE sqlite, READ_ONLY)")
+            self._conn.execute("CREATE VIEW dados AS SELECT * FROM banco.dados")
+
+    def totais(self, dimensao, tipo=None, limite=None):
+        """Como ConsultasPandas.totais, calculado em SQL."""
+        _validar_dimensao(dimensao)
+        sql = f"SELECT {dimensao}, CAST(COALESCE(SUM(valor), 0) AS BIGINT) AS valor FROM dados"
+        params = []
+        if tipo is not None:
+            sql += " WHERE tipo = ?"
+            params.append(tipo)
+        sql += f" GROUP BY {dimensao} ORDER BY valor DESC, {dimensao} ASC NULLS LAST"
+        if limite is not None:
+            sql += " LIMIT ?"
+            params.append(int(limite))
+        with self._lock:
+            resumo = self._conn.execute(sql, params).df()
+        return _padronizar(resumo, dimensao)
+
+    def agrupar(self, dimensoes):
+        """Como ConsultasPandas.agrupar, calculado em SQL."""
+        for dimensao in dimensoes:
+            _validar_dimensao(dimensao)
+        colunas = ', '.join(dimensoes)
+        with self._lock:
+            resumo = self._conn.execute(
+                f"SELECT {colunas}, CAST(COALESCE(SUM(valor), 0) AS BIGINT) AS valor FROM dados GROUP BY {colunas}"
+            ).df()
+        return _padronizar(resumo, *dimensoes)
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+def criar_consultas(origem, motor='pandas'):
+    """
+    Consultas de resumo sobre `origem` (DataFrame, diretório Parquet ou banco
+    SQLite) com o motor escolhido. Com pandas, caminhos são carregados antes
+    para a memória; sem duckdb instalado, o motor 'duckdb' recai em pandas.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de consultas desconhecido: {motor!r} (use uma de {', '.join(MOTORES)})")
+    if motor == 'duckdb' and DUCKDB_DISPONIVEL:
+        return ConsultasDuckDB(origem)
+    if isinstance(origem, pd.DataFrame):
+        return ConsultasPandas(origem)
+    colunas = ['tipo', 'grupo', 'forma_pgto', 'item', 'valor']
+    if os.path.isdir(origem):
+        from conselho_fiscal import colunar
+        return ConsultasPandas(colunar.ler_arquivo(origem, colunas=colunas))
+    return ConsultasPandas(obter_armazenamento(origem).consultar(
+        f"SELECT {', '.join(colunas)} FROM dados", rotulo='criar_consultas'
+    ))
+
+
+def resumir(consultas):
+    """
+    Todas as tabelas da aba de importação (VISOES_RESUMO) a partir de um único
+    agrupamento por tipo, grupo e forma de pagamento: cada visão soma as
+    poucas linhas desse agrupamento em vez de percorrer os lançamentos de novo.
+    Devolve {(dimensao, tipo): DataFrame} com `dimensao`, `valor` (centavos,
+    Int64, ordenado como em totais) e `percentual` do total da visão.
+    """
+    base = consultas.agrupar(('tipo', 'grupo', 'forma_pgto'))
+    resumos = {}
+    for dimensao, tipo in VISOES_RESUMO:
+        linhas = base if tipo is None else base[base['tipo'] == tipo]
+        resumo = _ordenar(linhas.groupby(dimensao, dropna=False, observed=True)['valor'].sum().reset_index(), dimensao)
+        resumo = _padronizar(resumo, dimensao)
+        resumo['percentual'] = resumo['valor'] / resumo['valor'].sum() * 100
+        resumos[(dimensao, tipo)] = resumo
+    return resumos
@@ -0,0 +1,122 @@
+"""
+Tempos e contadores por etapa de uma execução, para diagnóstico.
+
+Quem quer medir chama iniciar() (no app4, a cada rerun do script) e depois
+lê as Medicoes devolvidas; o código do núcleo só marca as etapas com
+`with etapa('nome'):` e os eventos com contar('nome'). Sem uma medição
+ativa as duas chamadas não registram nada, de modo que a instrumentação
+pode ficar em código usado também pela linha de comando e pelo lote.
+
+As medições ficam num ContextVar: cada sessão do Streamlit roda o script
+na própria thread e vê só as suas, mesmo com o banco compartilhado.
+"""
+
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+SEPARADOR = ' › '
+
+_medicoes = contextvars.ContextVar('conselho_fiscal_medicoes', default=None)
+
+
+class Registro:
+    """Etapa em andamento; `linhas` pode ser preenchido dentro do bloco"""
+
+    __slots__ = ('linhas',)
+
+    def __init__(self, linhas=None):
+        self.linhas = linhas
+
+
+class Medicoes:
+    """
+    Tempo, chamadas e linhas de cada etapa e contadores de eventos de uma
+    execução. Etapas aninhadas ficam com o caminho completo
+    ('importação › leitura da planilha'), na ordem em que começaram;
+    chamadas repetidas do mesmo caminho são somadas.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = {}  # caminho -> [chamadas, segundos, linhas ou None]
+        self.contadores = Counter()
+        self._pilha = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def etapa(self, nome, linhas=None):
+        self._pilha.append(nome)
+        caminho = SEPARADOR.join(self._pilha)
+        with self._lock:
+            # Reservado já na entrada: a ordem das linhas é a de início das etapas
+            self.etapas.setdefault(caminho, [0, 0.0, None])
+        registro = Registro(linhas)
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._pilha.pop()
+            with self._lock:
+                acumulado = self.etapas[caminho]
+                acumulado[0] += 1
+                acumulado[1] += segundos
+                if registro.linhas is not None:
+                    acumulado[2] = (acumulado[2] or 0) + registro.linhas
+
+    def contar(self, nome, quantidade=1):
+        with self._lock:
+            self.contadores[nome] += quantidade
+
+    def decorrido(self):
+        """Segundos desde iniciar()"""
+        return time.perf_counter() - self.inicio
+
+    def tabela(self):
+        """Uma linha por etapa: etapa, chamadas, total_ms e linhas (nulo se não informado)"""
+        import pandas as pd
+
+        with self._lock:
+            linhas = [
+                (caminho, chamadas, segundos * 1000, processadas)
+                for caminho, (chamadas, segundos, processadas) in self.etapas.items()
+            ]
+        tabela = pd.DataFrame(linhas, columns=['etapa', 'chamadas', 'total_ms', 'linhas'])
+        tabela['linhas'] = tabela['linhas'].astype('Int64')
+        return tabela
+
+
+def iniciar():
+    """Começa uma medição nova no contexto atual e a devolve"""
+    medicoes = Medicoes()
+    _medicoes.set(medicoes)
+    return medicoes
+
+
+def atual():
+    """Medição ativa no contexto atual, ou None"""
+    return _medicoes.get()
+
+
+@contextmanager
+def etapa(nome, linhas=None):
+    """
+    Mede o bloco como a etapa `nome` da medição ativa. Entrega um Registro
+    cujo `linhas` pode ser preenchido quando a quantidade só é conhecida no fim.
+    """
+    medicoes = _medicoes.get()
+    if medicoes is None:
+        yield Registro(linhas)
+        return
+    with medicoes.etapa(nome, linhas) as registro:
+        yield registro
+
+
+def contar(nome, quantidade=1):
+    """Soma `quantidade` ao contador `nome` da medição ativa, se houver"""
+    medicoes = _medicoes.get()
+    if medicoes is not None:
+        medicoes.contar(nome, quantidade)
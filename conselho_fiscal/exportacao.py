@@ -0,0 +1,167 @@
+"""Exportação para Excel: o demonstrativo processado e o relatório consolidado do banco."""
+
+import io
+
+import xlsxwriter
+
+from conselho_fiscal.banco import DB_PATH, obter_armazenamento
+
+# A partir deste tamanho o xlsxwriter grava linha a linha (constant_memory)
+LINHAS_MEMORIA_CONSTANTE = 50_000
+
+# Limite de linhas de uma planilha do Excel, cabeçalho incluído
+LINHAS_POR_PLANILHA = 1_048_576
+
+OPCOES_WORKBOOK = {
+    'strings_to_formulas': False,
+    'strings_to_urls': False,
+    'default_date_format': 'dd/mm/yyyy',
+}
+
+FORMATO_CABECALHO = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+FORMATO_DINHEIRO = {'num_format': '#,##0.00'}
+
+
+def gerar_excel(df):
+    """
+    Bytes de um .xlsx com o DataFrame processado, no layout do antigo
+    df.to_excel(index=False): cabeçalho em negrito e 'Valor' em reais.
+
+    As linhas são escritas em ordem, uma a uma, o que permite usar o modo
+    constant_memory do xlsxwriter nos arquivos grandes; os menores são
+    montados inteiramente em memória. Textos nunca viram fórmulas ou links.
+    """
+    grande = len(df) >= LINHAS_MEMORIA_CONSTANTE
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {'in_memory': not grande, 'constant_memory': grande, **OPCOES_WORKBOOK})
+    planilha = workbook.add_worksheet()
+    cabecalho = workbook.add_format(FORMATO_CABECALHO)
+    planilha.write_row(0, 0, [str(coluna) for coluna in df.columns], cabecalho)
+
+    if 'Valor' in df.columns:
+        df = df.assign(Valor=df['Valor'] / 100)  # centavos -> R$
+    colunas = [df[coluna].to_numpy(dtype=object, na_value=None) for coluna in df.columns]
+    for numero_linha, linha in enumerate(zip(*colunas), start=1):
+        planilha.write_row(numero_linha, 0, linha)
+
+    workbook.close()
+    return buffer.getvalue()
+
+
+# Linhas brutas do intervalo, já em R$, na ordem em que foram importadas
+SQL_RELATORIO_DADOS = """
+    SELECT referencia, tipo, grupo, item, competencia, liquidacao, documento, forma_pgto, valor / 100.0
+    FROM dados
+    WHERE periodo BETWEEN ? AND ?
+    ORDER BY periodo, id
+"""
+
+SQL_RELATORIO_PERIODOS = """
+    SELECT periodo, MIN(referencia) FROM resumo_mensal
+    WHERE periodo BETWEEN ? AND ?
+    GROUP BY periodo
+    ORDER BY periodo
+"""
+
+# Receitas, despesas e saldo de cada mês do intervalo, com o saldo acumulado
+SQL_RELATORIO_TENDENCIA = """
+    SELECT referencia, receitas / 100.0, despesas / 100.0, (receitas - despesas) / 100.0,
+           SUM(receitas - despesas) OVER (ORDER BY periodo) / 100.0, registros
+    FROM (
+        SELECT periodo, MIN(referencia) AS referencia,
+               SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE 0 END) AS receitas,
+               SUM(CASE WHEN tipo = 'Despesa' THEN valor ELSE 0 END) AS despesas,
+               SUM(registros) AS registros
+        FROM resumo_mensal
+        WHERE periodo BETWEEN ? AND ?
+        GROUP BY periodo
+    )
+    ORDER BY periodo
+"""
+
+CABECALHO_DADOS = ['Referência', 'Tipo', 'Grupo', 'Item', 'Competência', 'Liquidação', 'Documento', 'Forma de Pgto.', 'Valor']
+CABECALHO_TENDENCIA = ['Referência', 'Receitas', 'Despesas', 'Saldo', 'Saldo acumulado', 'Registros']
+
+
+def _sql_pivo(dimensao, periodos):
+    """
+    Totais do resumo_mensal por tipo e `dimensao`, com uma coluna por período
+    (SUM(CASE ...)), e o total do intervalo; valores em R$.
+    """
+    colunas = ''.join(f", SUM(CASE WHEN periodo = {periodo:d} THEN valor END) / 100.0" for periodo in periodos)
+    return f"""
+        SELECT tipo, {dimensao}{colunas}, SUM(valor) / 100.0 AS total
+        FROM resumo_mensal
+        WHERE periodo BETWEEN ? AND ?
+        GROUP BY tipo, {dimensao}
+        ORDER BY tipo DESC, total DESC
+    """
+
+
+def _escrever_planilhas(workbook, nome, cabecalho, linhas, colunas_dinheiro, formatos):
+    """
+    Escreve o cabeçalho e as linhas (um iterável, consumido uma vez) numa
+    planilha nova; se passar do limite do Excel, continua em "nome (2)" etc.
+    """
+    linhas = iter(linhas)
+    numero = 1
+    while True:
+        planilha = workbook.add_worksheet(nome if numero == 1 else f"{nome} ({numero})")
+        planilha.set_column(0, len(cabecalho) - 1, 14)
+        for coluna in colunas_dinheiro:
+            planilha.set_column(coluna, coluna, 14, formatos['dinheiro'])
+        planilha.freeze_panes(1, 0)
+        planilha.write_row(0, 0, cabecalho, formatos['cabecalho'])
+        for numero_linha, linha in enumerate(linhas, start=1):
+            planilha.write_row(numero_linha, 0, linha)
+            if numero_linha == LINHAS_POR_PLANILHA - 1:
+                break
+        else:
+            return
+        numero += 1
+
+
+def gerar_relatorio(periodo_inicial, periodo_final, destino=None, com_dados=True, db_path=DB_PATH):
+    """
+    Relatório consolidado dos períodos entre `periodo_inicial` e `periodo_final`
+    (aaaamm, inclusive), com as planilhas Dados, Por grupo, Por forma de pgto.
+    e Tendência mensal.
+
+    As tabelas dinâmicas e a tendência são calculadas em SQL sobre o
+    resumo_mensal, e as linhas brutas vão do cursor direto para o arquivo em
+    modo constant_memory: a memória usada depende do tamanho de uma linha,
+    não do histórico. Tudo é lido de um único retrato do banco
+    (Armazenamento.leitura_isolada), para que as planilhas sejam consistentes
+    entre si, sem bloquear as consultas das outras sessões enquanto o
+    arquivo é gravado.
+
+    `destino` pode ser um caminho ou arquivo aberto; sem ele, devolve os bytes.
+    Com `com_dados=False` a planilha de linhas brutas, a mais demorada, é omitida.
+    """
+    buffer = io.BytesIO() if destino is None else destino
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True, **OPCOES_WORKBOOK})
+    formatos = {
+        'cabecalho': workbook.add_format(FORMATO_CABECALHO),
+        'dinheiro': workbook.add_format(FORMATO_DINHEIRO),
+    }
+    intervalo = (periodo_inicial, periodo_final)
+
+    with obter_armazenamento(db_path).leitura_isolada('gerar_relatorio') as conn:
+        periodos = conn.execute(SQL_RELATORIO_PERIODOS, intervalo).fetchall()
+        rotulos = [referencia for _, referencia in periodos]
+        colunas_pivo = range(2, len(periodos) + 3)
+
+        if com_dados:
+            _escrever_planilhas(workbook, 'Dados', CABECALHO_DADOS, conn.execute(SQL_RELATORIO_DADOS, intervalo),
+                                [8], formatos)
+        _escrever_planilhas(workbook, 'Por grupo', ['Tipo', 'Grupo', *rotulos, 'Total'],
+                            conn.execute(_sql_pivo('grupo', [p for p, _ in periodos]), intervalo),
+                            colunas_pivo, formatos)
+        _escrever_planilhas(workbook, 'Por forma de pgto.', ['Tipo', 'Forma de Pgto.', *rotulos, 'Total'],
+                            conn.execute(_sql_pivo('forma_pgto', [p for p, _ in periodos]), intervalo),
+                            colunas_pivo, formatos)
+        _escrever_planilhas(workbook, 'Tendência mensal', CABECALHO_TENDENCIA,
+                            conn.execute(SQL_RELATORIO_TENDENCIA, intervalo), range(1, 5), formatos)
+
+    workbook.close()
+    return buffer.getvalue() if destino is None else None
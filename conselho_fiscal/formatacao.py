@@ -0,0 +1,51 @@
+"""Formatação de valores para exibição."""
+
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+
+def formatar_valor_brasileiro(valor):
+    """Formata valores em centavos para padrão brasileiro (R$ 1.234,56)"""
+    if pd.isna(valor):
+        return ""
+    reais, centavos = divmod(abs(int(valor)), 100)
+    sinal = "-" if valor < 0 else ""
+    return f"R$ {sinal}{reais:,}".replace(",", ".") + f",{centavos:02d}"
+
+
+def formatar_valores_brasileiros(valores):
+    """
+    Como formatar_valor_brasileiro, para uma coluna inteira de centavos de uma
+    vez: os grupos de milhar são separados com aritmética do numpy e os textos
+    montados pelas funções de string do pyarrow, sem chamar Python por linha.
+    Devolve uma Series de texto com o mesmo índice ("" nos nulos). Sem pyarrow,
+    recai em formatar_valor_brasileiro linha a linha.
+    """
+    valores = pd.Series(valores).astype('Int64')
+    if importlib.util.find_spec('pyarrow') is None:
+        return valores.map(formatar_valor_brasileiro).astype(str)
+    import pyarrow as pa  # carregado só aqui: pyarrow é opcional
+    import pyarrow.compute as pc
+
+    def texto(numeros, digitos):
+        return pc.utf8_lpad(pa.array(numeros).cast(pa.string()), digitos, '0')
+
+    nulos = valores.isna().to_numpy()
+    centavos = valores.fillna(0).to_numpy(dtype=np.int64)
+    reais, resto = np.divmod(np.abs(centavos), 100)
+
+    # Todos os grupos com 3 dígitos ("001.234.567") e depois sem os zeros à esquerda
+    inteiros = texto(reais % 1000, 3)
+    reais = reais // 1000
+    while reais.any():
+        inteiros = pc.binary_join_element_wise(texto(reais % 1000, 3), inteiros, '.')
+        reais = reais // 1000
+    inteiros = pc.utf8_ltrim(inteiros, '0.')
+    inteiros = pc.if_else(pc.equal(inteiros, ''), '0', inteiros)
+
+    sinais = pa.array(np.where(centavos < 0, 'R$ -', 'R$ '))
+    formatados = pc.binary_join_element_wise(sinais, inteiros, ',', texto(resto, 2), '')
+    formatados = pc.if_else(pa.array(nulos), '', formatados)
+    return formatados.to_pandas().astype(str).set_axis(valores.index)
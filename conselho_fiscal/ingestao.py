@@ -0,0 +1,270 @@
+"""Leitura em streaming das planilhas de receitas e despesas."""
+
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from conselho_fiscal import diagnostico
+
+# Posição de cada campo nas linhas de cada seção da planilha
+RECEITAS_COLUMNS = {'Item': 0, 'Competência': 1, 'Liquidação': 2, 'Valor': 4, 'Grupo_Checker': 5}
+DESPESAS_COLUMNS = {'Item': 0, 'Competência': 1, 'Liquidação': 2, 'Documento': 3,
+                    'Forma de Pgto.': 4, 'Grupo_Checker': 5, 'Valor': 6}
+LARGURA_MINIMA = 7
+
+# Versão do DataFrame devolvido por process_excel_file: incremente a cada mudança
+# de colunas, tipos ou valores, para que as leituras guardadas em disco por
+# versões anteriores do parser (cache.CacheLeituras) não sejam reaproveitadas
+VERSAO_FORMATO = 1
+
+# Colunas com poucos valores distintos, devolvidas como Categorical
+COLUNAS_CATEGORICAS = ['Tipo', 'Grupo', 'Competência', 'Liquidação', 'Forma de Pgto.']
+
+
+class PlanilhaInvalidaError(ValueError):
+    """A planilha não tem as seções 'Receitas' e 'Despesas' esperadas."""
+
+
+def _first_cell_text(row):
+    return '' if row[0] is None else str(row[0])
+
+
+def read_sections(source):
+    """
+    Streams the first sheet of the workbook with openpyxl in read-only mode
+    and splits it, in a single pass, into the raw rows of the 'Receitas' and
+    'Despesas' sections (rows whose Item starts with 'Total' are skipped).
+
+    As with pd.read_excel, the first row of the sheet is taken as the header
+    and ignored. Returns a (receitas, despesas) pair of DataFrames with the
+    columns of RECEITAS_COLUMNS and DESPESAS_COLUMNS, or None when the
+    section headers cannot be found.
+    """
+    secoes = {
+        'Receitas': {coluna: [] for coluna in RECEITAS_COLUMNS},
+        'Despesas': {coluna: [] for coluna in DESPESAS_COLUMNS},
+    }
+    posicoes = {'Receitas': RECEITAS_COLUMNS, 'Despesas': DESPESAS_COLUMNS}
+    secao_atual = None
+
+    import openpyxl  # carregado só aqui para não pesar no import do núcleo
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        planilha = workbook.worksheets[0]
+        # The stored <dimension> may be stale and would cut the stream short (pandas does the same)
+        planilha.reset_dimensions()
+        linhas = planilha.iter_rows(min_row=2, values_only=True)
+        for linha in linhas:
+            if len(linha) < LARGURA_MINIMA:
+                linha = tuple(linha) + (None,) * (LARGURA_MINIMA - len(linha))
+            texto = _first_cell_text(linha)
+            if secao_atual is None and texto.strip() == 'Receitas':
+                secao_atual = 'Receitas'
+                continue
+            if secao_atual == 'Receitas' and texto.strip() == 'Despesas':
+                secao_atual = 'Despesas'
+                continue
+            if secao_atual is None or texto.startswith('Total'):
+                continue
+            for coluna, posicao in posicoes[secao_atual].items():
+                secoes[secao_atual][coluna].append(linha[posicao])
+    finally:
+        workbook.close()
+
+    if secao_atual != 'Despesas':
+        return None
+    return pd.DataFrame(secoes['Receitas']), pd.DataFrame(secoes['Despesas'])
+
+
+def _float_or_nan(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def _parse_brazilian_numbers(text):
+    """
+    Parses a NumPy array of stripped strings written in the Brazilian format,
+    handling parentheses for negative numbers, percentage signs, thousands
+    separators (dot) and decimal commas. Strings that cannot be parsed become NaN.
+    """
+    negative = np.strings.startswith(text, '(') & np.strings.endswith(text, ')')
+    if negative.any():
+        text = text.copy()
+        text[negative] = [t[1:-1] for t in text[negative].tolist()] # Remove parentheses
+    if (np.strings.find(text, '%') >= 0).any():
+        text = np.strings.replace(text, '%', '') # Remove percentage sign
+    text = np.strings.replace(text, '.', '') # Remove thousands separator (dot)
+    text = np.strings.replace(text, ',', '.') # Replace comma with dot for decimal
+
+    try:
+        parsed = text.astype(float)
+    except ValueError:
+        parsed = np.array([_float_or_nan(t) for t in text.tolist()], dtype=float)
+    parsed[negative] *= -1
+    return parsed
+
+
+def _parse_text_cells(cells):
+    """
+    Parses an object array of str cells (Brazilian format, surrounding spaces
+    allowed). Returns the floats, NaN where the text is not a number, and a
+    mask of the blank cells.
+
+    With pyarrow installed the whole parse runs in pyarrow.compute, straight
+    from the Python strings (no fixed-width NumPy copy first); when some text
+    is not a number, or without pyarrow, it falls back to
+    _parse_brazilian_numbers.
+    """
+    if importlib.util.find_spec('pyarrow') is not None:
+        import pyarrow as pa  # carregado só aqui: pyarrow é opcional
+        import pyarrow.compute as pc
+
+        text = pc.utf8_trim_whitespace(pa.array(cells, type=pa.string()))
+        blank = pc.equal(text, '')
+        negative = pc.and_(pc.starts_with(text, '('), pc.ends_with(text, ')'))
+        text = pc.if_else(negative, pc.utf8_slice_codeunits(text, 1, -1), text) # Remove parentheses
+        text = pc.replace_substring(text, '%', '') # Remove percentage sign
+        text = pc.replace_substring(text, '.', '') # Remove thousands separator (dot)
+        text = pc.replace_substring(text, ',', '.') # Replace comma with dot for decimal
+        text = pc.if_else(blank, pa.scalar(None, pa.string()), text) # Blank cells become NaN
+        try:
+            parsed = pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False).copy()
+        except pa.ArrowInvalid:
+            pass
+        else:
+            parsed[negative.to_numpy(zero_copy_only=False)] *= -1
+            return parsed, blank.to_numpy(zero_copy_only=False)
+
+    text = np.strings.strip(cells.astype(str))
+    return _parse_brazilian_numbers(text), text == ''
+
+
+def clean_and_convert_values(values):
+    """
+    Vectorized conversion of the 'Valor' column to floats.
+
+    Native numbers (as returned by openpyxl) pass straight through; only text
+    cells go through the Brazilian number parser (_parse_text_cells). Returns the converted values
+    and a boolean mask of the non-empty cells that could not be converted,
+    which are left as NaN instead of raising.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float), pd.Series(False, index=values.index)
+
+    raw = values.to_numpy(dtype=object)
+    missing = pd.isna(raw)
+    kind = pd.api.types.infer_dtype(raw, skipna=True)
+    if kind == 'string':
+        is_text = ~missing
+    elif kind in ('mixed', 'mixed-integer'):
+        is_text = np.fromiter((isinstance(v, str) for v in raw), dtype=bool, count=len(raw))
+    else:
+        is_text = np.zeros(len(raw), dtype=bool)
+
+    numbers = np.full(len(raw), np.nan)
+    is_native = ~is_text & ~missing
+    if is_native.any():
+        numbers[is_native] = pd.to_numeric(pd.Series(raw[is_native]), errors='coerce').to_numpy(dtype=float)
+    invalid = is_native & np.isnan(numbers)
+
+    if is_text.any():
+        parsed, blank = _parse_text_cells(raw[is_text])
+        numbers[is_text] = parsed
+        invalid[is_text] = np.isnan(parsed) & ~blank
+
+    return pd.Series(numbers, index=values.index), pd.Series(invalid, index=values.index)
+
+
+def propagate_group_headers(items, is_header):
+    """
+    Vectorized replacement for the row-by-row group loop: every row receives
+    the Item of the closest group header row above it. Header rows, and rows
+    that appear before the first header, get an empty group.
+    """
+    header_number = is_header.cumsum()
+    header_names = items[is_header]
+    header_names.index = range(1, len(header_names) + 1)
+    groups = header_number.map(header_names)
+    return groups.where(~is_header & (header_number > 0), '')
+
+
+def process_excel_file(uploaded_file):
+    """
+    Processes the uploaded Excel file to extract and combine
+    revenue and expense data into a standardized DataFrame.
+    'Valor' is returned in integer cents (nullable Int64) and the
+    low-cardinality columns of COLUNAS_CATEGORICAS as categoricals of the
+    text as it appears in the sheet (columns mixing in numbers are left as
+    they are).
+
+    Raises PlanilhaInvalidaError when the section headers cannot be found.
+    The number of values that could not be converted (and were left blank)
+    is kept in df.attrs['valores_invalidos'].
+
+    Each step is timed as a stage of the active diagnostico measurement.
+    """
+    with diagnostico.etapa('leitura da planilha') as registro:
+        secoes = read_sections(uploaded_file)
+        registro.linhas = sum(map(len, secoes or ()))
+    if secoes is None:
+        raise PlanilhaInvalidaError("Não foi possível encontrar os cabeçalhos 'Receitas' ou 'Despesas' com correspondência exata. Verifique o conteúdo do arquivo.")
+    with diagnostico.etapa('grupos', linhas=registro.linhas):
+        df_final = _combine_sections(*secoes)
+
+    with diagnostico.etapa('conversão de valores', linhas=len(df_final)):
+        df_final['Valor'], valores_invalidos = clean_and_convert_values(df_final['Valor'])
+        # Valores em centavos inteiros, para que as somas batam com os totais da planilha
+        df_final['Valor'] = (df_final['Valor'] * 100).round().astype('Int64')
+
+    with diagnostico.etapa('categorias', linhas=len(df_final)):
+        df_final['Forma de Pgto.'] = df_final['Forma de Pgto.'].replace('', pd.NA)
+        df_final['Forma de Pgto.'] = df_final['Forma de Pgto.'].fillna('Outros')
+
+        # Códigos inteiros + um dicionário por coluna: menos memória e filtros/groupbys mais rápidos.
+        # Colunas com números misturados ficam como estão (a categoria uniria 1 e 1.0)
+        for col in COLUNAS_CATEGORICAS:
+            if pd.api.types.infer_dtype(df_final[col], skipna=True) in ('string', 'empty'):
+                df_final[col] = df_final[col].astype('category')
+
+    df_final.attrs['valores_invalidos'] = int(valores_invalidos.sum())
+    return df_final
+
+
+def _combine_sections(df_receitas, df_despesas):
+    """
+    Assigns each row its group and type, drops the group header rows and
+    stacks both sections in the final column order ('Valor' still raw).
+    """
+    # --- Process Receitas ---
+    df_receitas['Tipo'] = 'Receita'
+
+    eh_cabecalho_receita = (pd.isna(df_receitas['Grupo_Checker']) | (df_receitas['Grupo_Checker'].astype(str).str.strip() == '')) & \
+                           (pd.isna(df_receitas['Valor']) | (df_receitas['Valor'].astype(str).str.strip() == ''))
+    df_receitas['Grupo'] = propagate_group_headers(df_receitas['Item'], eh_cabecalho_receita)
+
+    df_receitas_processadas = df_receitas[~eh_cabecalho_receita].copy()
+
+    # --- Process Despesas ---
+    df_despesas['Tipo'] = 'Despesa'
+
+    eh_cabecalho_despesa = pd.isna(df_despesas['Grupo_Checker']) | (df_despesas['Grupo_Checker'].astype(str).str.strip() == '')
+    df_despesas['Grupo'] = propagate_group_headers(df_despesas['Item'], eh_cabecalho_despesa)
+
+    df_despesas_processadas = df_despesas.dropna(subset=['Grupo_Checker']).copy()
+
+    # --- Standardize and Combine DataFrames ---
+    colunas_finais = ['Tipo', 'Grupo', 'Item', 'Competência', 'Liquidação', 'Documento', 'Forma de Pgto.', 'Valor']
+
+    for col in ['Documento', 'Forma de Pgto.']:
+        if col not in df_receitas_processadas.columns:
+            df_receitas_processadas[col] = None
+        df_receitas_processadas[col] = df_receitas_processadas[col].astype(object)
+
+    df_receitas_processadas_final = df_receitas_processadas.reindex(columns=colunas_finais)
+    df_despesas_processadas_final = df_despesas_processadas.reindex(columns=colunas_finais)
+
+    return pd.concat([df_receitas_processadas_final, df_despesas_processadas_final], ignore_index=True)
@@ -0,0 +1,92 @@
+"""Importação em lote de várias planilhas, processadas em paralelo."""
+
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from conselho_fiscal.banco import DB_PATH, carregar_referencias, inserir_varios
+from conselho_fiscal.ingestao import process_excel_file
+from conselho_fiscal.referencias import extrair_referencia_padronizada
+
+
+@dataclass
+class ResultadoArquivo:
+    """Resultado do processamento de uma planilha do lote."""
+    nome: str
+    referencia: str = None
+    dados: pd.DataFrame = None
+    segundos: float = 0.0
+    erro: str = None
+    importado: bool = False
+
+
+def _processar_arquivo(nome, origem):
+    """Lê uma planilha (caminho ou bytes) num processo do pool, sem deixar a exceção escapar."""
+    inicio = time.perf_counter()
+    fonte = io.BytesIO(origem) if isinstance(origem, bytes) else origem
+    try:
+        df = process_excel_file(fonte)
+        referencia = extrair_referencia_padronizada(df)
+    except Exception as erro:  # uma planilha ruim não interrompe o lote
+        return ResultadoArquivo(nome, segundos=time.perf_counter() - inicio, erro=f"{type(erro).__name__}: {erro}")
+    return ResultadoArquivo(nome, referencia, df, time.perf_counter() - inicio)
+
+
+def processar_lote(arquivos, processos=None):
+    """
+    Processa em paralelo uma lista de pares (nome, caminho ou bytes) e devolve
+    um ResultadoArquivo por arquivo, na mesma ordem. `processos` limita o
+    número de processos do pool (padrão: um por núcleo).
+
+    Os processos são criados com spawn, não fork: o lote também roda dentro
+    do servidor do Streamlit, com várias threads, o lock do banco e o loop do
+    Tornado, que um fork copiaria em estado inconsistente.
+    """
+    if not arquivos:
+        return []
+    nomes, origens = zip(*arquivos)
+    if len(arquivos) == 1 or processos == 1:
+        return [_processar_arquivo(nome, origem) for nome, origem in arquivos]
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(_processar_arquivo, nomes, origens))
+
+
+def importar_lote(resultados, db_path=DB_PATH):
+    """
+    Grava numa única transação todas as planilhas processadas com sucesso.
+    Referências já existentes no banco ou repetidas no lote são marcadas
+    como erro e ficam de fora; as demais entram juntas.
+    """
+    existentes = set(carregar_referencias(db_path))
+    a_gravar = {}
+    for resultado in resultados:
+        if resultado.erro:
+            continue
+        if resultado.referencia in existentes:
+            resultado.erro = f"Referência {resultado.referencia} já foi importada"
+        elif resultado.referencia in a_gravar:
+            resultado.erro = f"Referência {resultado.referencia} repetida no lote"
+        else:
+            a_gravar[resultado.referencia] = resultado
+
+    inserir_varios({referencia: resultado.dados for referencia, resultado in a_gravar.items()}, db_path)
+    for resultado in a_gravar.values():
+        resultado.importado = True
+    return resultados
+
+
+def relatorio_lote(resultados):
+    """Tabela com a situação, a referência e o tempo de cada arquivo do lote."""
+    return pd.DataFrame({
+        'Arquivo': [r.nome for r in resultados],
+        'Referência': [r.referencia for r in resultados],
+        'Linhas': [None if r.dados is None else len(r.dados) for r in resultados],
+        'Valores inválidos': [None if r.dados is None else r.dados.attrs.get('valores_invalidos', 0) for r in resultados],
+        'Tempo (s)': [round(r.segundos, 3) for r in resultados],
+        'Situação': ['importado' if r.importado else (r.erro or 'não importado') for r in resultados],
+    }).astype({'Linhas': 'Int64', 'Valores inválidos': 'Int64'})
+
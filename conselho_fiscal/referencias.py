@@ -0,0 +1,39 @@
+"""Identificação do período de referência de cada demonstrativo."""
+
+import calendar
+import re
+
+# Meses abreviados
+MESES_ABREV = {f"{i:02d}": nome.lower() for i, nome in enumerate(calendar.month_abbr) if nome}
+MESES_REV = {v.lower(): f"{k:02d}" for k,v in enumerate(calendar.month_abbr) if v}
+
+
+def extrair_referencia_padronizada(df):
+    referencia = df['Liquidação'].mode(dropna=True)
+    if not referencia.empty:
+        ref_raw = str(referencia.iloc[0])
+        match = re.match(r"(\d{1,2})/(\d{4})", ref_raw)
+        if match:
+            mes = int(match.group(1))
+            ano = match.group(2)
+            mes_abrev = calendar.month_abbr[mes].lower()
+            return f"{mes_abrev}/{ano}"
+        partes = ref_raw.lower().split('/')
+        if len(partes) == 2 and partes[0] in MESES_REV:
+            return f"{partes[0]}/{partes[1]}"
+        return ref_raw
+    return 'desconhecido'
+
+
+def periodo_da_referencia(referencia):
+    """
+    Chave inteira aaaamm da referência, para ordenar e filtrar no banco.
+    Aceita 'abr/2025', 'mm/aaaa' e 'dd/mm/aaaa'; devolve None para as demais.
+    """
+    partes = str(referencia).strip().lower().split('/')
+    if len(partes) not in (2, 3) or not partes[-1].isdigit() or len(partes[-1]) != 4:
+        return None
+    mes = MESES_REV.get(partes[-2], partes[-2])
+    if not mes.isdigit() or not 1 <= int(mes) <= 12:
+        return None
+    return int(partes[-1]) * 100 + int(mes)
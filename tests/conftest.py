@@ -0,0 +1,12 @@
+"""
+Põe a raiz do projeto no sys.path, para que os testes importem conselho_fiscal
+e benchmarks também quando rodados com `pytest` (de qualquer diretório), e
+não só com `python -m pytest` na raiz.
+"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
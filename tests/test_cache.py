@@ -0,0 +1,34 @@
+import pandas as pd
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.cache import CacheLeituras
+from conselho_fiscal.ingestao import process_excel_file
+
+
+def test_leitura_do_disco_igual_a_da_planilha(tmp_path):
+    caminho = tmp_path / 'planilha.xlsx'
+    gerar_planilha(caminho, linhas=500)
+    conteudo = caminho.read_bytes()
+    original = process_excel_file(caminho)
+
+    CacheLeituras(diretorio=tmp_path / 'cache').obter(conteudo, lambda: process_excel_file(caminho))
+    # Instância nova: só o arquivo Parquet pode responder
+    cache = CacheLeituras(diretorio=tmp_path / 'cache')
+    df = cache.obter(conteudo, lambda: None)
+
+    assert cache.acertos == 1
+    pd.testing.assert_frame_equal(df, original)
+    assert df.attrs == original.attrs
+
+
+def test_leitura_de_outra_versao_do_parser_nao_e_reaproveitada(tmp_path):
+    caminho = tmp_path / 'planilha.xlsx'
+    gerar_planilha(caminho, linhas=500)
+    conteudo = caminho.read_bytes()
+
+    CacheLeituras(diretorio=tmp_path / 'cache', versao=1).obter(conteudo, lambda: process_excel_file(caminho))
+    cache = CacheLeituras(diretorio=tmp_path / 'cache', versao=2)
+    df = cache.obter(conteudo, lambda: process_excel_file(caminho).assign(Valor=0))
+
+    assert (cache.acertos, cache.falhas) == (0, 1)
+    assert (df['Valor'] == 0).all()
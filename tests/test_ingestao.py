@@ -0,0 +1,124 @@
+import re
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from benchmarks.planilha_sintetica import gerar_planilha
+from conselho_fiscal.ingestao import clean_and_convert_values, process_excel_file, read_sections
+
+
+def _com_dimensao(origem, destino, intervalo):
+    """Cópia de `origem` com <dimension ref=intervalo> gravado na primeira planilha"""
+    with zipfile.ZipFile(origem) as entrada, zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as saida:
+        for nome in entrada.namelist():
+            conteudo = entrada.read(nome)
+            if nome == 'xl/worksheets/sheet1.xml':
+                xml = re.sub(r'<dimension [^>]*/>', '', conteudo.decode('utf-8'))
+                xml = xml.replace('<sheetViews>', f'<dimension ref="{intervalo}"/><sheetViews>', 1)
+                conteudo = xml.encode('utf-8')
+            saida.writestr(nome, conteudo)
+
+
+def _referencia_pandas(caminho):
+    """Número de lançamentos e total de Valor (centavos) lidos com pd.read_excel"""
+    bruto = pd.read_excel(caminho, header=None, skiprows=1).reindex(columns=range(7))
+    primeira = bruto[0].astype(str).str.strip()
+    inicio_despesas = primeira[primeira == 'Despesas'].index[0]
+    inicio_receitas = primeira[primeira == 'Receitas'].index[0]
+    lancamento = ~bruto[0].astype(str).str.startswith('Total')
+    receitas = bruto[lancamento & (bruto[5].notna() | bruto[4].notna())].loc[inicio_receitas + 1:inicio_despesas - 1]
+    despesas = bruto[lancamento & bruto[5].notna()].loc[inicio_despesas + 1:]
+    valores, _ = clean_and_convert_values(pd.concat([receitas[4], despesas[6]], ignore_index=True))
+    return len(receitas) + len(despesas), int((valores * 100).round().sum())
+
+
+@pytest.mark.parametrize('intervalo', ['A1:G1200', 'A1:F3000', 'A1:F50'])
+def test_dimensao_desatualizada_nao_corta_a_leitura(tmp_path, intervalo):
+    original = tmp_path / 'original.xlsx'
+    desatualizada = tmp_path / 'desatualizada.xlsx'
+    gerar_planilha(original, linhas=2000, itens_por_grupo=20)
+    _com_dimensao(original, desatualizada, intervalo)
+
+    df = process_excel_file(desatualizada)
+
+    linhas, total = _referencia_pandas(desatualizada)
+    assert len(df) == linhas == 2000
+    assert df['Valor'].sum() == total
+    assert df.attrs['valores_invalidos'] == 0
+    pd.testing.assert_frame_equal(df, process_excel_file(original))
+
+
+def _grupos_linha_a_linha(secao, eh_cabecalho):
+    """O laço original, linha a linha, mantido como referência da versão vetorizada"""
+    grupos = pd.Series('', index=secao.index, dtype=object)
+    grupo_atual = ''
+    for idx in secao.index:
+        if eh_cabecalho(secao.loc[idx]):
+            grupo_atual = secao.loc[idx, 'Item']
+        else:
+            grupos.loc[idx] = grupo_atual
+    return grupos
+
+
+def _vazio(valor):
+    return pd.isna(valor) or str(valor).strip() == ''
+
+
+def _cabecalho_receita(linha):
+    return _vazio(linha['Grupo_Checker']) and _vazio(linha['Valor'])
+
+
+def _cabecalho_despesa(linha):
+    return _vazio(linha['Grupo_Checker'])
+
+
+LINHAS_GRUPOS = [
+    ['Demonstrativo'],
+    ['Receitas'],
+    ['Rendimento avulso', '01/2025', '10/01/2025', None, '12,50', 'Conta'],  # antes de qualquer grupo
+    ['Condomínio'],
+    ['Taxa 101', '01/2025', '05/01/2025', None, 1500, 'Conta'],
+    ['Taxa 102', '01/2025', '05/01/2025', None, '1.500,00', 'Conta'],
+    ['Total Condomínio'],
+    ['Extras', None, None, None, '', '  '],  # cabeçalho com células em branco
+    ['Diversos'],  # cabeçalhos consecutivos: vale o último
+    ['Multa', '01/2025', '07/01/2025', None, '(30,00)', 'Conta'],
+    ['Despesas'],
+    ['Tarifa avulsa', '01/2025', '02/01/2025', 'NF 1', 'PIX', 'Conta', 9.9],  # antes de qualquer grupo
+    ['Pessoal'],
+    ['Manutenção', None, None, None, None, ' '],
+    ['Elevador', '01/2025', '03/01/2025', 'NF 2', 'Boleto', 'Conta', '800,00'],
+    ['Total Manutenção'],
+    ['Diversos'],  # mesmo nome de grupo nas duas seções
+    ['Cópias', '01/2025', '04/01/2025', None, None, 'Conta', 12],
+    ['Condomínio'],
+    ['Repasse', '01/2025', '05/01/2025', 'NF 3', 'Transferência', 'Conta', '1.000,00'],
+]
+
+
+def test_grupos_vetorizados_iguais_ao_laco_original(tmp_path):
+    caminho = tmp_path / 'grupos.xlsx'
+    workbook = openpyxl.Workbook()
+    for linha in LINHAS_GRUPOS:
+        workbook.active.append(linha)
+    workbook.save(caminho)
+
+    receitas, despesas = read_sections(caminho)
+    receitas['Grupo'] = _grupos_linha_a_linha(receitas, _cabecalho_receita)
+    despesas['Grupo'] = _grupos_linha_a_linha(despesas, _cabecalho_despesa)
+    receitas = receitas[~receitas.apply(_cabecalho_receita, axis=1)].assign(Tipo='Receita')
+    despesas = despesas.dropna(subset=['Grupo_Checker']).assign(Tipo='Despesa')
+    esperado = pd.concat([receitas, despesas], ignore_index=True)[['Tipo', 'Grupo', 'Item']]
+
+    df = process_excel_file(caminho)
+
+    pd.testing.assert_frame_equal(df[['Tipo', 'Grupo', 'Item']].astype(object), esperado.astype(object))
+    # Como no laço original, o cabeçalho de despesa com Grupo_Checker só com
+    # espaços fica entre os lançamentos (dropna não o remove), sem grupo
+    assert list(zip(esperado['Item'], esperado['Grupo'])) == [
+        ('Rendimento avulso', ''), ('Taxa 101', 'Condomínio'), ('Taxa 102', 'Condomínio'), ('Multa', 'Diversos'),
+        ('Tarifa avulsa', ''), ('Manutenção', ''), ('Elevador', 'Manutenção'), ('Cópias', 'Diversos'),
+        ('Repasse', 'Condomínio'),
+    ]